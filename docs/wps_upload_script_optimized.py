@@ -7,6 +7,7 @@ WPS表格上传脚本 - 优化版
 优化了日志记录和用户体验
 """
 
+import json
 import requests
 import time
 from datetime import datetime
@@ -27,6 +28,9 @@ CONFIG = {
     'log_level': 'INFO'  # 新增：日志级别
 }
 
+# 复用同一个HTTP会话，分批上传与状态查询共用keep-alive连接，避免每批重新握手
+SESSION = requests.Session()
+
 class Logger:
     """日志管理器"""
 
@@ -190,10 +194,12 @@ def upload_batch(batch_data, batch_num, total_batches):
 
     try:
         start_time = time.time()
-        response = requests.post(
+        # 中文直接以UTF-8编码、使用紧凑分隔符，请求体约为 \uXXXX 转义形式的一半，服务端解析也更快
+        body = json.dumps(upload_payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        response = SESSION.post(
             CONFIG['server_url'],
-            json=upload_payload,
-            headers={'Content-Type': 'application/json'},
+            data=body,
+            headers={'Content-Type': 'application/json; charset=utf-8'},
             timeout=CONFIG['timeout']
         )
         upload_time = time.time() - start_time
@@ -254,7 +260,7 @@ def get_database_status():
     logger.info("获取数据库状态信息")
 
     try:
-        response = requests.get(
+        response = SESSION.get(
             'http://114.55.118.105/api/database/status',
             timeout=CONFIG['timeout']
         )
@@ -370,7 +376,7 @@ def main():
     try:
         # 1. 测试服务器连接
         logger.info("测试服务器连接")
-        response = requests.get('http://114.55.118.105', timeout=CONFIG['timeout'])
+        response = SESSION.get('http://114.55.118.105', timeout=CONFIG['timeout'])
         if response.status_code != 200:
             logger.error("服务器连接失败")
             return False
@@ -72,18 +72,18 @@ def handle_api_command(args):
     if args.action == 'start':
         print(f"🚀 启动 API 服务 (端口: {args.port})...")
         from src.api.wps_api import app
-        app.run(host='0.0.0.0', port=args.port)
+        app.run(host='0.0.0.0', port=args.port, threaded=True)
     elif args.action == 'status':
-        import subprocess
-        result = subprocess.run(['ps', 'aux'], capture_output=True, text=True)
-        if 'wps_api.py' in result.stdout or 'wps_upload_api.py' in result.stdout:
+        # 直接请求本机健康检查接口，无需启动 ps 子进程扫描进程列表
+        import json
+        import urllib.request
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{args.port}/", timeout=3) as resp:
+                health = json.loads(resp.read())
             print("✅ API 服务正在运行")
-            # 显示进程信息
-            for line in result.stdout.split('\n'):
-                if 'wps_api.py' in line or 'wps_upload_api.py' in line:
-                    print(f"  {line}")
-        else:
-            print("❌ API 服务未运行")
+            print(f"  端口: {args.port}, 数据库: {health.get('database', 'unknown')}")
+        except Exception as e:
+            print(f"❌ API 服务未运行 (端口: {args.port}): {e}")
 
 def handle_sync_command(args):
     """处理同步命令"""
@@ -122,9 +122,9 @@ def handle_test_command(args):
 
     if args.type in ['sync', 'all']:
         print("\n📋 测试同步功能...")
-        import subprocess
-        result = subprocess.run([sys.executable, 'scripts/test_immediate_sync.py'])
-        if result.returncode != 0:
+        # 在当前进程内直接调用，省去启动子解释器的开销，并能拿到测试函数的返回结果
+        from scripts.test_immediate_sync import test_immediate_gitlab_sync
+        if not test_immediate_gitlab_sync():
             print("❌ 同步测试失败")
             return
 
@@ -0,0 +1,16 @@
+-- 为issues表添加 (项目名称, 问题描述) 组合索引
+-- WPS上传按该组合键批量查询已存在记录，索引后查询不再扫描同一项目下的全部议题
+-- 执行前请先备份数据库
+
+USE issue_database;
+
+-- problem_description 为 TEXT 类型，索引取前255个字符
+ALTER TABLE issues
+ADD INDEX idx_project_problem (project_name, problem_description(255));
+
+-- 验证修改
+SELECT INDEX_NAME, COLUMN_NAME, SUB_PART
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = 'issue_database'
+  AND TABLE_NAME = 'issues'
+  AND INDEX_NAME = 'idx_project_problem';
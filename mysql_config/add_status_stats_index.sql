@@ -0,0 +1,16 @@
+-- 为issues表添加 (状态, GitLab链接) 覆盖索引
+-- /api/database/status 的统计查询只读取这两列，可直接扫描索引而不必读取含TEXT字段的整行
+-- 执行前请先备份数据库
+
+USE issue_database;
+
+ALTER TABLE issues
+ADD INDEX idx_status_gitlab_url (status, gitlab_url);
+
+-- 验证统计查询使用覆盖索引（Extra 列应包含 Using index）
+EXPLAIN SELECT
+    COUNT(*) as total_issues,
+    SUM(CASE WHEN status = 'open' THEN 1 ELSE 0 END) as open_issues,
+    SUM(CASE WHEN status = 'closed' THEN 1 ELSE 0 END) as closed_issues,
+    SUM(CASE WHEN gitlab_url IS NOT NULL AND gitlab_url != '' THEN 1 ELSE 0 END) as synced_issues
+FROM issues;
@@ -46,8 +46,10 @@ CREATE TABLE issues (
 
     -- 索引
     INDEX idx_project_name (project_name),
+    INDEX idx_project_problem (project_name, problem_description(255)),
     INDEX idx_problem_category (problem_category),
     INDEX idx_status (status),
+    INDEX idx_status_gitlab_url (status, gitlab_url),
     INDEX idx_responsible_person (responsible_person),
     INDEX idx_sync_status (sync_status),
     INDEX idx_gitlab_id (gitlab_id),
@@ -7,7 +7,7 @@
 import sys
 import re
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any
 from datetime import datetime
 
 # 添加项目根目录到Python路径
@@ -17,14 +17,20 @@ sys.path.insert(0, str(project_root))
 from src.gitlab.core.database_manager import DatabaseManager
 from src.gitlab.core.gitlab_issue_manager import GitLabIssueManager, load_config
 
-def extract_issue_iid_from_url(gitlab_url: str) -> Optional[int]:
-    """从GitLab URL中提取议题IID"""
-    if not gitlab_url:
-        return None
-    match = re.search(r'/-/issues/(\d+)', gitlab_url)
-    if match:
-        return int(match.group(1))
-    return None
+# MySQL 字符串字面量转义表：单次 translate 处理全部特殊字符
+SQL_ESCAPE_TABLE = str.maketrans({
+    '\\': '\\\\',
+    "'": "\\'",
+    '"': '\\"',
+    '\0': '\\0',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\x1a': '\\Z',
+})
+
+def escape_sql_string(value: Any) -> str:
+    """转义字符串以便拼入打印的SQL建议语句"""
+    return str(value).translate(SQL_ESCAPE_TABLE)
 
 def get_all_gitlab_issues(manager: GitLabIssueManager, project_id: int) -> List[Dict[str, Any]]:
     """获取GitLab项目中的所有议题"""
@@ -52,7 +58,7 @@ def get_all_gitlab_issues(manager: GitLabIssueManager, project_id: int) -> List[
                 req.add_header(k, v)
 
             with urllib.request.urlopen(req, timeout=30) as resp:
-                issues = json.loads(resp.read().decode('utf-8'))
+                issues = json.loads(resp.read())
                 if not issues or len(issues) == 0:
                     break
                 all_issues.extend(issues)
@@ -131,14 +137,7 @@ def check_closed_issues_match():
 
         # 1. 获取数据库中有gitlab_url的议题（用于排除已匹配的）
         print("📋 查询数据库中有gitlab_url的议题...")
-        issues_with_url = db_manager.get_issues_with_gitlab_url()
-        existing_iids = set()
-        for issue in issues_with_url:
-            url = issue.get('gitlab_url', '')
-            if url:
-                iid = extract_issue_iid_from_url(url)
-                if iid:
-                    existing_iids.add(iid)
+        existing_iids = set(db_manager.iter_linked_issue_iids())
         print(f"   已排除 {len(existing_iids)} 个已有gitlab_url的议题")
         print()
 
@@ -264,7 +263,7 @@ def check_closed_issues_match():
             print("更新SQL建议（前20个）")
             print("=" * 80)
             for match in matched_issues[:20]:
-                gitlab_url_escaped = match['gitlab_url'].replace("'", "''")
+                gitlab_url_escaped = escape_sql_string(match['gitlab_url'])
                 print(f"-- 议题ID {match['db_id']}: {match['db_project']}")
                 print(f"UPDATE issues SET gitlab_url = '{gitlab_url_escaped}', sync_status = 'synced', last_sync_time = NOW() WHERE id = {match['db_id']};")
                 print()
@@ -7,9 +7,8 @@
 """
 
 import sys
-import re
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any
 from datetime import datetime
 
 # 添加项目根目录到Python路径
@@ -18,15 +17,7 @@ sys.path.insert(0, str(project_root))
 
 from src.gitlab.core.database_manager import DatabaseManager
 from src.gitlab.core.gitlab_issue_manager import GitLabIssueManager, load_config
-
-def extract_issue_iid_from_url(gitlab_url: str) -> Optional[int]:
-    """从GitLab URL中提取议题IID"""
-    if not gitlab_url:
-        return None
-    match = re.search(r'/-/issues/(\d+)', gitlab_url)
-    if match:
-        return int(match.group(1))
-    return None
+from src.gitlab.core.gitlab_operations import extract_issue_iid as extract_issue_iid_from_url
 
 def get_all_gitlab_issues(manager: GitLabIssueManager, project_id: int) -> List[Dict[str, Any]]:
     """获取GitLab项目中的所有议题"""
@@ -54,7 +45,7 @@ def get_all_gitlab_issues(manager: GitLabIssueManager, project_id: int) -> List[
                 req.add_header(k, v)
 
             with urllib.request.urlopen(req, timeout=30) as resp:
-                issues = json.loads(resp.read().decode('utf-8'))
+                issues = json.loads(resp.read())
                 if not issues or len(issues) == 0:
                     break
                 all_issues.extend(issues)
@@ -73,7 +64,7 @@ def get_all_gitlab_issues(manager: GitLabIssueManager, project_id: int) -> List[
 
     return all_issues
 
-def check_gitlab_url_sync():
+def check_gitlab_url_sync(clear_invalid: bool = False):
     """检查GitLab议题和数据库同步情况"""
     try:
         print("=" * 80)
@@ -186,6 +177,16 @@ def check_gitlab_url_sync():
                 print(f"  ... 还有 {len(invalid_issues) - 20} 个无效议题")
             print()
 
+        if clear_invalid and invalid_issues:
+            # 收集全部无效议题ID，合并为单条 UPDATE ... WHERE id IN 清除
+            to_clear: List[int] = [item['id'] for item in invalid_issues]
+            print(f"🧹 批量清除 {len(to_clear)} 个无效gitlab_url...")
+            if db_manager.bulk_clear_gitlab_urls(to_clear):
+                print("   ✅ 已清除并重置为待同步")
+            else:
+                print("   ❌ 清除失败，事务已回滚")
+            print()
+
         # 5. 检查没有gitlab_url的议题是否在GitLab中创建了
         print("=" * 80)
         print("检查结果2: 检查没有gitlab_url的议题是否在GitLab中创建了")
@@ -262,6 +263,8 @@ def check_gitlab_url_sync():
                 print(f"  1. 有 {len(invalid_issues)} 个议题的gitlab_url无效，建议:")
                 print("     - 检查这些议题是否在GitLab中被删除")
                 print("     - 或者更新数据库中的gitlab_url字段")
+                if not clear_invalid:
+                    print("     - 或运行: python3 scripts/check_gitlab_url_sync.py --clear-invalid 批量清除")
             if potential_missing:
                 print(f"  2. 有 {len(potential_missing)} 个议题可能已创建但未同步gitlab_url，建议:")
                 print("     - 手动检查这些议题，确认是否匹配")
@@ -273,5 +276,10 @@ def check_gitlab_url_sync():
         traceback.print_exc()
 
 if __name__ == '__main__':
-    check_gitlab_url_sync()
+    import argparse
+    parser = argparse.ArgumentParser(description='检查GitLab议题和数据库同步情况')
+    parser.add_argument('--clear-invalid', action='store_true', help='清除无效的gitlab_url并重置为待同步')
+    args = parser.parse_args()
+
+    check_gitlab_url_sync(clear_invalid=args.clear_invalid)
 
@@ -41,7 +41,7 @@ try:
         req.add_header(k, v)
 
     with urllib.request.urlopen(req, timeout=30) as resp:
-        user_info = json.loads(resp.read().decode('utf-8'))
+        user_info = json.loads(resp.read())
         print(f"✅ Token有效，用户: {user_info.get('username', 'N/A')}")
         print(f"   用户ID: {user_info.get('id', 'N/A')}")
 except Exception as e:
@@ -58,7 +58,7 @@ try:
         req.add_header(k, v)
 
     with urllib.request.urlopen(req, timeout=30) as resp:
-        package_info = json.loads(resp.read().decode('utf-8'))
+        package_info = json.loads(resp.read())
         print(f"✅ Package信息:")
         print(f"   ID: {package_info.get('id')}")
         print(f"   名称: {package_info.get('name', 'N/A')}")
@@ -93,7 +93,7 @@ try:
         req.add_header(k, v)
 
     with urllib.request.urlopen(req, timeout=30) as resp:
-        files = json.loads(resp.read().decode('utf-8'))
+        files = json.loads(resp.read())
         print(f"✅ 找到 {len(files)} 个文件:")
         for f in files:
             print(f"   File ID: {f.get('id')}, 文件名: {f.get('file_name', 'N/A')}")
@@ -8,7 +8,7 @@
 import sys
 import re
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Tuple
 from datetime import datetime
 
 # 添加项目根目录到Python路径
@@ -18,15 +18,6 @@ sys.path.insert(0, str(project_root))
 from src.gitlab.core.database_manager import DatabaseManager
 from src.gitlab.core.gitlab_issue_manager import GitLabIssueManager, load_config
 
-def extract_issue_iid_from_url(gitlab_url: str) -> Optional[int]:
-    """从GitLab URL中提取议题IID"""
-    if not gitlab_url:
-        return None
-    match = re.search(r'/-/issues/(\d+)', gitlab_url)
-    if match:
-        return int(match.group(1))
-    return None
-
 def get_all_gitlab_issues(manager: GitLabIssueManager, project_id: int) -> List[Dict[str, Any]]:
     """获取GitLab项目中的所有议题"""
     import urllib.request
@@ -53,7 +44,7 @@ def get_all_gitlab_issues(manager: GitLabIssueManager, project_id: int) -> List[
                 req.add_header(k, v)
 
             with urllib.request.urlopen(req, timeout=30) as resp:
-                issues = json.loads(resp.read().decode('utf-8'))
+                issues = json.loads(resp.read())
                 if not issues or len(issues) == 0:
                     break
                 all_issues.extend(issues)
@@ -128,14 +119,7 @@ def fix_closed_issues_urls(dry_run: bool = True, min_score: int = 30):
 
         # 1. 获取数据库中有gitlab_url的议题（用于排除已匹配的）
         print("📋 查询数据库中有gitlab_url的议题...")
-        issues_with_url = db_manager.get_issues_with_gitlab_url()
-        existing_iids = set()
-        for issue in issues_with_url:
-            url = issue.get('gitlab_url', '')
-            if url:
-                iid = extract_issue_iid_from_url(url)
-                if iid:
-                    existing_iids.add(iid)
+        existing_iids = set(db_manager.iter_linked_issue_iids())
         print(f"   已排除 {len(existing_iids)} 个已有gitlab_url的议题")
         print()
 
@@ -170,6 +154,7 @@ def fix_closed_issues_urls(dry_run: bool = True, min_score: int = 30):
         updated_count = 0
         failed_count = 0
         skipped_count = 0
+        pending_updates: List[Tuple[int, str]] = []
 
         for db_issue in closed_issues:
             db_id = db_issue['id']
@@ -195,24 +180,13 @@ def fix_closed_issues_urls(dry_run: bool = True, min_score: int = 30):
                 print(f"   GitLab URL: {gitlab_url}")
 
                 if not dry_run:
-                    gitlab_url_escaped = gitlab_url.replace("'", "''")
-                    update_sql = f"""
-                    UPDATE issues
-                    SET gitlab_url = '{gitlab_url_escaped}',
-                        sync_status = 'synced',
-                        last_sync_time = NOW()
-                    WHERE id = {db_id}
-                    """
-                    if db_manager.execute_update(update_sql):
-                        updated_count += 1
-                        if gitlab_iid is not None:
-                            existing_iids.add(gitlab_iid)
-                        available_gitlab_issues = [issue for issue in available_gitlab_issues
-                                                  if issue.get('iid') != gitlab_iid]
-                        print(f"   ✅ 数据库已更新")
-                    else:
-                        failed_count += 1
-                        print(f"   ❌ 数据库更新失败")
+                    # 先收集更新语句，匹配结束后在同一事务中提交
+                    pending_updates.append((db_id, gitlab_url))
+                    if gitlab_iid is not None:
+                        existing_iids.add(gitlab_iid)
+                    available_gitlab_issues = [issue for issue in available_gitlab_issues
+                                              if issue.get('iid') != gitlab_iid]
+                    print(f"   📝 已加入待更新列表")
                 else:
                     matched_count += 1
                     print(f"   [模拟] 将更新数据库")
@@ -223,6 +197,24 @@ def fix_closed_issues_urls(dry_run: bool = True, min_score: int = 30):
                 print(f"⏭️  跳过: 数据库议题 #{db_id} 匹配分数 {best_score} < {min_score} (最低要求)")
                 print()
 
+        if pending_updates:
+            print(f"💾 在单个事务中更新 {len(pending_updates)} 个议题...")
+            update_sql = """
+            UPDATE issues
+            SET gitlab_url = %s,
+                sync_status = 'synced',
+                last_sync_time = NOW()
+            WHERE id = %s
+            """
+            params_seq = [(gitlab_url, db_id) for db_id, gitlab_url in pending_updates]
+            if db_manager.execute_many(update_sql, params_seq):
+                updated_count = len(pending_updates)
+                print(f"   ✅ 数据库已更新")
+            else:
+                failed_count = len(pending_updates)
+                print(f"   ❌ 数据库更新失败，事务已回滚")
+            print()
+
         # 5. 统计总结
         print("=" * 80)
         print("修复总结")
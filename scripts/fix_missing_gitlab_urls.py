@@ -8,7 +8,7 @@
 import sys
 import re
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Tuple
 from datetime import datetime
 
 # 添加项目根目录到Python路径
@@ -18,15 +18,6 @@ sys.path.insert(0, str(project_root))
 from src.gitlab.core.database_manager import DatabaseManager
 from src.gitlab.core.gitlab_issue_manager import GitLabIssueManager, load_config
 
-def extract_issue_iid_from_url(gitlab_url: str) -> Optional[int]:
-    """从GitLab URL中提取议题IID"""
-    if not gitlab_url:
-        return None
-    match = re.search(r'/-/issues/(\d+)', gitlab_url)
-    if match:
-        return int(match.group(1))
-    return None
-
 def get_all_gitlab_issues(manager: GitLabIssueManager, project_id: int) -> List[Dict[str, Any]]:
     """获取GitLab项目中的所有议题"""
     import urllib.request
@@ -53,7 +44,7 @@ def get_all_gitlab_issues(manager: GitLabIssueManager, project_id: int) -> List[
                 req.add_header(k, v)
 
             with urllib.request.urlopen(req, timeout=30) as resp:
-                issues = json.loads(resp.read().decode('utf-8'))
+                issues = json.loads(resp.read())
                 if not issues or len(issues) == 0:
                     break
                 all_issues.extend(issues)
@@ -98,6 +89,18 @@ def match_issue(db_issue: Dict[str, Any], gitlab_issue: Dict[str, Any]) -> bool:
 
     return True
 
+def update_gitlab_urls(db_manager: DatabaseManager, updates: List[Tuple[int, str]]) -> bool:
+    """使用 executemany 在单个事务中更新多个议题的gitlab_url，任一失败则整体回滚"""
+    update_sql = """
+    UPDATE issues
+    SET gitlab_url = %s,
+        sync_status = 'synced',
+        last_sync_time = NOW()
+    WHERE id = %s
+    """
+    params_seq = [(gitlab_url, db_id) for db_id, gitlab_url in updates]
+    return db_manager.execute_many(update_sql, params_seq)
+
 def fix_missing_gitlab_urls(dry_run: bool = True):
     """修复缺失的gitlab_url"""
     try:
@@ -142,14 +145,7 @@ def fix_missing_gitlab_urls(dry_run: bool = True):
 
         # 3. 获取数据库中有gitlab_url的议题（用于排除已匹配的）
         print("📋 查询数据库中有gitlab_url的议题...")
-        issues_with_url = db_manager.get_issues_with_gitlab_url()
-        existing_urls = set()
-        for issue in issues_with_url:
-            url = issue.get('gitlab_url', '')
-            if url:
-                iid = extract_issue_iid_from_url(url)
-                if iid:
-                    existing_urls.add(iid)
+        existing_urls = set(db_manager.iter_linked_issue_iids())
         print(f"   已排除 {len(existing_urls)} 个已有gitlab_url的议题")
         print()
 
@@ -161,6 +157,7 @@ def fix_missing_gitlab_urls(dry_run: bool = True):
         matched_count = 0
         updated_count = 0
         failed_count = 0
+        pending_updates: List[Tuple[int, str]] = []
 
         for db_issue in issues_without_url:
             db_id = db_issue['id']
@@ -204,27 +201,26 @@ def fix_missing_gitlab_urls(dry_run: bool = True):
                 print(f"   匹配分数: {best_score}")
 
                 if not dry_run:
-                    # 更新数据库
-                    update_sql = f"""
-                    UPDATE issues
-                    SET gitlab_url = '{gitlab_url.replace("'", "''")}',
-                        sync_status = 'synced',
-                        last_sync_time = NOW()
-                    WHERE id = {db_id}
-                    """
-                    if db_manager.execute_update(update_sql):
-                        updated_count += 1
-                        existing_urls.add(gitlab_iid)  # 标记为已使用
-                        print(f"   ✅ 数据库已更新")
-                    else:
-                        failed_count += 1
-                        print(f"   ❌ 数据库更新失败")
+                    # 收集待更新记录，匹配结束后合并为一条UPDATE
+                    pending_updates.append((db_id, gitlab_url))
+                    existing_urls.add(gitlab_iid)  # 标记为已使用
+                    print(f"   📝 已加入待更新列表")
                 else:
                     matched_count += 1
                     print(f"   [模拟] 将更新数据库")
 
                 print()
 
+        if pending_updates:
+            print(f"💾 在单个事务中更新 {len(pending_updates)} 个议题...")
+            if update_gitlab_urls(db_manager, pending_updates):
+                updated_count = len(pending_updates)
+                print(f"   ✅ 数据库已更新")
+            else:
+                failed_count = len(pending_updates)
+                print(f"   ❌ 数据库更新失败，事务已回滚")
+            print()
+
         # 5. 统计总结
         print("=" * 80)
         print("修复总结")
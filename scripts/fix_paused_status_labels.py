@@ -75,14 +75,14 @@ def fix_paused_status_labels():
 
             if success:
                 # 更新数据库中的进度标签
-                update_sql = f"""
+                update_sql = """
                 UPDATE issues
                 SET gitlab_progress = '进度::Pausing',
                     sync_status = 'synced',
                     last_sync_time = NOW()
-                WHERE id = {issue_id}
+                WHERE id = %s
                 """
-                db_manager.execute_update(update_sql)
+                db_manager.execute_update(update_sql, (issue_id,))
                 print(f"   ✅ 标签更新成功")
                 fixed_count += 1
             else:
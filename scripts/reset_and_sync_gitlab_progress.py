@@ -13,7 +13,7 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.gitlab.core.database_manager import DatabaseManager
-from src.gitlab.core.gitlab_operations import GitLabOperations
+from src.gitlab.core.gitlab_operations import GitLabOperations, extract_issue_iid
 
 def reset_and_sync_gitlab_progress(dry_run: bool = True):
     """清空gitlab_progress字段并重新从GitLab获取"""
@@ -40,30 +40,9 @@ def reset_and_sync_gitlab_progress(dry_run: bool = True):
         print(f"   找到 {len(issues)} 个有GitLab URL的议题")
         print()
         
-        # 2. 先清空gitlab_progress字段
+        # 2. 从GitLab获取进度信息（先只收集，清空与写回在步骤2的同一事务中完成）
         print("=" * 80)
-        print("步骤1: 清空gitlab_progress字段")
-        print("=" * 80)
-        
-        if not dry_run:
-            clear_sql = """
-            UPDATE issues
-            SET gitlab_progress = ''
-            WHERE gitlab_url IS NOT NULL AND gitlab_url != '' AND gitlab_url != 'NULL'
-            """
-            if db_manager.execute_update(clear_sql):
-                print(f"✅ 已清空 {len(issues)} 个议题的gitlab_progress字段")
-            else:
-                print(f"❌ 清空gitlab_progress字段失败")
-                return
-        else:
-            print(f"[模拟] 将清空 {len(issues)} 个议题的gitlab_progress字段")
-        
-        print()
-        
-        # 3. 重新从GitLab获取进度信息
-        print("=" * 80)
-        print("步骤2: 从GitLab重新获取进度信息")
+        print("步骤1: 从GitLab重新获取进度信息")
         print("=" * 80)
         
         success_count = 0
@@ -71,7 +50,15 @@ def reset_and_sync_gitlab_progress(dry_run: bool = True):
         updated_count = 0
         unchanged_count = 0
         skipped_count = 0
+        # 有进度标签的议题 {议题ID: 进度}，包括与原值相同的（清空后需要写回）
+        pending_progress = {}
         
+        # 按 iids[] 批量预取GitLab议题（每100个一次请求），循环内不再逐条请求
+        print("🔍 批量获取GitLab议题详情...")
+        gitlab_issues_by_iid = gitlab_ops.get_issues_by_urls([issue.get('gitlab_url') or '' for issue in issues])
+        print(f"📥 已获取 {len(gitlab_issues_by_iid)} 个GitLab议题")
+        print()
+
         for i, issue in enumerate(issues, 1):
             issue_id = issue['id']
             project_name = issue.get('project_name', '未知项目')
@@ -88,48 +75,29 @@ def reset_and_sync_gitlab_progress(dry_run: bool = True):
             
             try:
                 # 从GitLab获取进度信息
-                progress = gitlab_ops.sync_progress_from_gitlab(gitlab_url)
+                issue_iid = extract_issue_iid(gitlab_url)
+                progress = gitlab_ops.sync_progress_from_gitlab(
+                    gitlab_url, issue_iid, gitlab_issues_by_iid.get(issue_iid) if issue_iid else None
+                )
                 
                 if progress:
+                    pending_progress[issue_id] = progress
                     # 检查进度是否有变化
                     if progress != current_progress:
-                        if not dry_run:
-                            # 更新数据库
-                            if db_manager.update_issue_progress(issue_id, progress):
-                                print(f"  ✅ 进度已更新: '{current_progress}' -> '{progress}'")
-                                updated_count += 1
-                                success_count += 1
-                            else:
-                                print(f"  ❌ 数据库更新失败")
-                                failed_count += 1
-                        else:
-                            print(f"  [模拟] 进度将更新: '{current_progress}' -> '{progress}'")
-                            updated_count += 1
-                            success_count += 1
+                        print(f"  {'[模拟] ' if dry_run else ''}进度将更新: '{current_progress}' -> '{progress}'")
+                        updated_count += 1
                     else:
                         print(f"  ✓ 进度无变化: '{progress}'")
                         unchanged_count += 1
-                        success_count += 1
+                    success_count += 1
                 else:
-                    # closed状态的议题不应该有进度标签，设置为空
-                    if not dry_run:
-                        if db_manager.update_issue_progress(issue_id, ''):
-                            if current_progress:
-                                print(f"  ✅ 已清空进度标签（closed状态）: '{current_progress}' -> ''")
-                                updated_count += 1
-                            else:
-                                print(f"  ✓ 进度已为空（closed状态）")
-                            success_count += 1
-                        else:
-                            print(f"  ❌ 数据库更新失败")
-                            failed_count += 1
+                    # closed状态的议题不应该有进度标签，由统一清空处理
+                    if current_progress:
+                        print(f"  {'[模拟] ' if dry_run else ''}将清空进度标签（closed状态）: '{current_progress}' -> ''")
+                        updated_count += 1
                     else:
-                        if current_progress:
-                            print(f"  [模拟] 将清空进度标签（closed状态）: '{current_progress}' -> ''")
-                            updated_count += 1
-                        else:
-                            print(f"  ✓ 进度已为空（closed状态）")
-                        success_count += 1
+                        print(f"  ✓ 进度已为空（closed状态）")
+                    success_count += 1
                 
             except Exception as e:
                 print(f"  ❌ 处理异常: {str(e)}")
@@ -137,6 +105,29 @@ def reset_and_sync_gitlab_progress(dry_run: bool = True):
             
             print()
         
+        # 3. 清空与写回在同一事务中提交：只有一次提交，中途失败不会留下被清空的进度
+        print("=" * 80)
+        print("步骤2: 清空gitlab_progress字段并写回进度")
+        print("=" * 80)
+        if not dry_run:
+            clear_sql = """
+            UPDATE issues
+            SET gitlab_progress = ''
+            WHERE gitlab_url IS NOT NULL AND gitlab_url != '' AND gitlab_url != 'NULL'
+            """
+            statements = [(clear_sql, None)] + db_manager.build_progress_update_statements(pending_progress)
+            if db_manager.execute_transaction(statements):
+                print(f"✅ 已清空 {len(issues)} 个议题的gitlab_progress字段并写回 {len(pending_progress)} 个进度")
+            else:
+                print(f"❌ 数据库更新失败，事务已回滚")
+                failed_count += success_count
+                success_count = 0
+                updated_count = 0
+                unchanged_count = 0
+        else:
+            print(f"[模拟] 将清空 {len(issues)} 个议题的gitlab_progress字段并写回 {len(pending_progress)} 个进度")
+        print()
+        
         # 4. 输出统计结果
         print("=" * 80)
         print("同步完成")
@@ -14,10 +14,13 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.gitlab.core.database_manager import DatabaseManager
-from src.gitlab.core.gitlab_operations import GitLabOperations
+from src.gitlab.core.gitlab_operations import GitLabOperations, extract_issue_iid
 
-def sync_all_gitlab_progress():
-    """批量同步所有议题的GitLab进度信息"""
+def sync_all_gitlab_progress(verbose: bool = False):
+    """
+    批量同步所有议题的GitLab进度信息
+    默认只输出失败的议题和汇总，verbose=True 时输出每个议题的处理过程
+    """
     try:
         print("=" * 60)
         print("批量同步GitLab进度信息到数据库")
@@ -46,6 +49,14 @@ def sync_all_gitlab_progress():
         skipped_count = 0
         updated_count = 0
         unchanged_count = 0
+        # 有变化的进度先收集，最后一次批量写入数据库
+        pending_progress = {}
+
+        # 按 iids[] 批量预取GitLab议题（每100个一次请求），循环内不再逐条请求
+        print("🔍 批量获取GitLab议题详情...")
+        gitlab_issues_by_iid = gitlab_ops.get_issues_by_urls([issue.get('gitlab_url') or '' for issue in issues])
+        print(f"📥 已获取 {len(gitlab_issues_by_iid)} 个GitLab议题")
+        print()
 
         # 处理每个议题
         for i, issue in enumerate(issues, 1):
@@ -54,41 +65,55 @@ def sync_all_gitlab_progress():
             gitlab_url = issue.get('gitlab_url', '')
             current_progress = issue.get('gitlab_progress', '')
 
-            print(f"[{i}/{len(issues)}] 处理议题 #{issue_id}: {project_name}")
+            if verbose:
+                print(f"[{i}/{len(issues)}] 处理议题 #{issue_id}: {project_name}")
 
             # 检查gitlab_url是否有效
             if not gitlab_url or gitlab_url.strip() == '' or gitlab_url.upper() == 'NULL':
-                print(f"  ⏭️  跳过: 无效的GitLab URL")
+                if verbose:
+                    print(f"  ⏭️  跳过: 无效的GitLab URL")
                 skipped_count += 1
                 continue
 
             try:
                 # 从GitLab获取进度信息
-                progress = gitlab_ops.sync_progress_from_gitlab(gitlab_url)
+                issue_iid = extract_issue_iid(gitlab_url)
+                progress = gitlab_ops.sync_progress_from_gitlab(
+                    gitlab_url, issue_iid, gitlab_issues_by_iid.get(issue_iid) if issue_iid else None, verbose
+                )
 
                 if progress:
                     # 检查进度是否有变化
                     if progress != current_progress:
-                        # 更新数据库
-                        if db_manager.update_issue_progress(issue_id, progress):
-                            print(f"  ✅ 进度已更新: '{current_progress}' -> '{progress}'")
-                            updated_count += 1
-                            success_count += 1
-                        else:
-                            print(f"  ❌ 数据库更新失败")
-                            failed_count += 1
+                        if verbose:
+                            print(f"  🔄 进度待更新: '{current_progress}' -> '{progress}'")
+                        pending_progress[issue_id] = progress
                     else:
-                        print(f"  ✓ 进度无变化: '{progress}'")
+                        if verbose:
+                            print(f"  ✓ 进度无变化: '{progress}'")
                         unchanged_count += 1
                         success_count += 1
                 else:
-                    print(f"  ⚠️  未能从GitLab获取进度信息")
+                    print(f"  ⚠️  议题 #{issue_id} ({project_name}) 未能从GitLab获取进度信息")
                     failed_count += 1
 
             except Exception as e:
-                print(f"  ❌ 处理异常: {str(e)}")
+                print(f"  ❌ 议题 #{issue_id} ({project_name}) 处理异常: {str(e)}")
                 failed_count += 1
 
+            if verbose:
+                print()
+
+        # 批量更新有变化的进度
+        if pending_progress:
+            print(f"💾 批量更新 {len(pending_progress)} 个议题的进度...")
+            if db_manager.update_issues_progress(pending_progress):
+                print(f"✅ 进度已更新: {len(pending_progress)} 个")
+                updated_count += len(pending_progress)
+                success_count += len(pending_progress)
+            else:
+                print(f"❌ 数据库批量更新失败")
+                failed_count += len(pending_progress)
             print()
 
         # 输出统计结果
@@ -118,7 +143,12 @@ def sync_all_gitlab_progress():
         return None
 
 if __name__ == "__main__":
-    result = sync_all_gitlab_progress()
+    import argparse
+    parser = argparse.ArgumentParser(description='批量同步GitLab进度信息到数据库')
+    parser.add_argument('--verbose', action='store_true', help='输出每个议题的处理过程')
+    args = parser.parse_args()
+
+    result = sync_all_gitlab_progress(verbose=args.verbose)
     if result:
         sys.exit(0)
     else:
@@ -15,6 +15,27 @@ sys.path.append(str(project_root))
 from src.gitlab.core.database_manager import DatabaseManager
 from src.gitlab.core.gitlab_issue_manager import GitLabIssueManager, load_config
 
+# 标签映射在模块加载时构建一次，不在每个议题的循环中重复创建
+SEVERITY_LABELS = {
+    "1": ("客户需求::紧急",),
+    "2": ("客户需求::中等",),
+    "3": ("客户需求::一般",),
+    "4": ("客户需求::一般",)
+}
+
+PROGRESS_LABELS = {
+    "open": "进度::To do",
+    "paused": "进度::Pausing",
+    "delayed": "进度::Delayed"
+}
+
+# 按优先级匹配的议题类型关键词
+ISSUE_TYPE_KEYWORDS = (
+    (("bug", "错误", "故障", "问题", "崩溃", "异常"), "议题类型::Bug"),
+    (("算法", "模型", "检测", "识别", "分析", "计算"), "议题类型::算法需求"),
+    (("新增", "添加", "开发", "实现", "功能", "模块"), "议题类型::新增功能"),
+)
+
 def update_issue_labels():
     """更新议题标签"""
     try:
@@ -67,42 +88,28 @@ def update_issue_labels():
             labels = []
 
             # 严重程度标签 - 使用硬编码映射
-            severity_mapping = {
-                "1": ["客户需求::紧急"],
-                "2": ["客户需求::中等"],
-                "3": ["客户需求::一般"],
-                "4": ["客户需求::一般"]
-            }
-
             severity_str = str(severity_level)
-            if severity_str in severity_mapping:
-                labels.extend(severity_mapping[severity_str])
+            labels.extend(SEVERITY_LABELS.get(severity_str, ()))
 
             # 进度标签（closed状态不添加进度标签）
+            progress_label = ''
             if status != 'closed':
-                progress_mapping = {
-                    "open": "进度::To do",
-                    "paused": "进度::Pausing",
-                    "delayed": "进度::Delayed"
-                }
-                progress_label = progress_mapping.get(status, '进度::To do')
+                progress_label = PROGRESS_LABELS.get(status, '进度::To do')
                 labels.append(progress_label)
 
             # 议题类型标签 - 简化版本
             problem_desc = problem_description.lower()
-            if any(keyword in problem_desc for keyword in ["bug", "错误", "故障", "问题", "崩溃", "异常"]):
-                labels.append("议题类型::Bug")
-            elif any(keyword in problem_desc for keyword in ["算法", "模型", "检测", "识别", "分析", "计算"]):
-                labels.append("议题类型::算法需求")
-            elif any(keyword in problem_desc for keyword in ["新增", "添加", "开发", "实现", "功能", "模块"]):
-                labels.append("议题类型::新增功能")
+            for keywords, type_label in ISSUE_TYPE_KEYWORDS:
+                if any(keyword in problem_desc for keyword in keywords):
+                    labels.append(type_label)
+                    break
             else:
                 labels.append("议题类型::功能优化")
 
             # 固定标签
             labels.append("跟踪")
 
-            print(f"   严重程度: {severity_level} → 标签: {severity_mapping.get(severity_str, [])}")
+            print(f"   严重程度: {severity_level} → 标签: {list(SEVERITY_LABELS.get(severity_str, ()))}")
             print(f"   状态: {status} → 标签: {progress_label}")
             print(f"   所有标签: {labels}")
 
@@ -5,42 +5,194 @@ WPS数据上传API服务
 接收WPS表格数据并保存到数据库
 """
 
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import re
 import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
 # 添加项目路径
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.gitlab.core.database_manager import DatabaseManager
+from src.gitlab.core.database_manager import DatabaseManager, DB_POOL_SIZE
 from src.gitlab.core.config_manager import ConfigManager
+from src.gitlab.core.gitlab_operations import has_gitlab_url
 from src.gitlab.services.manual_sync import (
+    SYNC_TASK_WORKERS,
     process_pending_sync_queue as service_process_pending_sync_queue,
 )
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
-from typing import Any, Dict
+from werkzeug.exceptions import HTTPException
+from werkzeug.serving import WSGIRequestHandler
+from typing import Any, Dict, Tuple
 
 app = Flask(__name__)
 CORS(app)  # 允许跨域请求
 
+# 请求体大小上限，超出时直接返回413，避免异常请求占用大量内存
+MAX_UPLOAD_BYTES = 32 * 1024 * 1024
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES
+# 单次上传的记录数上限（WPS客户端按50条分批上传）
+MAX_UPLOAD_RECORDS = 5000
+
+# JSON响应使用紧凑格式、直接输出UTF-8中文，不排序键（减少序列化开销与响应体积）
+app.json.compact = True
+app.json.ensure_ascii = False
+app.json.sort_keys = False
+
+# 使用 HTTP/1.1 保持长连接，客户端与nginx可复用TCP连接（jsonify 已带 Content-Length）
+WSGIRequestHandler.protocol_version = "HTTP/1.1"
+
 # 初始化组件
 db_manager = DatabaseManager()
 config_manager = ConfigManager()
 
+# 逐条记录的详细日志仅在 DEBUG 级别输出（WPS_API_LOG_LEVEL=DEBUG 开启）
+# 设置 WPS_API_LOG_FILE 时写入文件；日志先缓冲在内存中，每个请求结束或遇到 ERROR 时批量写出
+LOG_BUFFER_CAPACITY = 512
+logger = logging.getLogger('wps_api')
+logger.setLevel(os.environ.get('WPS_API_LOG_LEVEL', 'INFO').upper())
+if not logger.handlers:
+    _log_file = os.environ.get('WPS_API_LOG_FILE')
+    _log_target = logging.FileHandler(_log_file, encoding='utf-8') if _log_file else logging.StreamHandler()
+    _log_target.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logger.addHandler(logging.handlers.MemoryHandler(
+        capacity=LOG_BUFFER_CAPACITY,
+        flushLevel=logging.ERROR,
+        target=_log_target,
+    ))
+
+def flush_logs():
+    """将缓冲的日志写出"""
+    for handler in logger.handlers:
+        handler.flush()
+
+# 多线程模式下的并发上限：请求线程与后台同步线程合计不超过数据库连接池大小
+# 队列处理线程共享同一个同步任务线程池，该线程池最多有 SYNC_TASK_WORKERS 个线程同时访问数据库
+# 队列处理串行执行：并行认领时同一议题的任务可能被拆到两次处理中乱序执行（如关闭先于创建）
+# 单次处理内不同议题的任务仍在共享线程池中并发执行
+SYNC_QUEUE_WORKERS = 1
+# 新议题并发同步到GitLab的线程数（所有请求共享同一线程池，同样计入连接预算）
+NEW_ISSUE_SYNC_WORKERS = 4
+MAX_CONCURRENT_REQUESTS = max(1, DB_POOL_SIZE - SYNC_QUEUE_WORKERS - SYNC_TASK_WORKERS - NEW_ISSUE_SYNC_WORKERS)
+REQUEST_SLOT_TIMEOUT = 30
+_request_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+
+@app.before_request
+def acquire_request_slot():
+    """获取请求处理名额，避免并发请求耗尽数据库连接池"""
+    if not _request_slots.acquire(timeout=REQUEST_SLOT_TIMEOUT):
+        return jsonify({
+            'success': False,
+            'error': '服务繁忙，请稍后重试',
+            'timestamp': datetime.now().isoformat()
+        }), 503
+    g.request_slot = True
+    # 同一请求内的查询/更新复用同一个数据库连接，首次访问数据库时才借出
+    db_manager.bind_connection()
+
+@app.teardown_request
+def release_request_slot(exc=None):
+    """释放请求处理名额与绑定的数据库连接，并写出本次请求缓冲的日志"""
+    if g.pop('request_slot', False):
+        db_manager.release_connection()
+        _request_slots.release()
+    flush_logs()
+
+# 上传后的同步队列处理在后台线程中执行，请求立即返回任务ID
+SYNC_JOB_HISTORY_LIMIT = 100
+_sync_executor = ThreadPoolExecutor(max_workers=SYNC_QUEUE_WORKERS, thread_name_prefix='sync-queue')
+_issue_sync_executor = ThreadPoolExecutor(max_workers=NEW_ISSUE_SYNC_WORKERS, thread_name_prefix='issue-sync')
+_sync_jobs: Dict[str, Future] = {}
+_sync_jobs_lock = threading.Lock()
+
+def submit_sync_queue_job():
+    """提交后台同步队列处理任务，返回任务ID"""
+    job_id = uuid.uuid4().hex
+    future = _sync_executor.submit(service_process_pending_sync_queue, db_manager, config_manager)
+    with _sync_jobs_lock:
+        # 只保留最近的任务记录，优先清理已完成的任务
+        if len(_sync_jobs) >= SYNC_JOB_HISTORY_LIMIT:
+            for old_id in [jid for jid, f in _sync_jobs.items() if f.done()]:
+                del _sync_jobs[old_id]
+                if len(_sync_jobs) < SYNC_JOB_HISTORY_LIMIT:
+                    break
+        _sync_jobs[job_id] = future
+    return job_id
+
+# 健康检查/状态接口的响应缓存（监控高频轮询时复用已序列化的结果）
+STATUS_CACHE_TTL = 1.0
+# 数据库统计需要聚合整张 issues 表，且允许更长时间的延迟
+DATABASE_STATUS_CACHE_TTL = 5.0
+_response_cache: Dict[str, Dict[str, Any]] = {}
+_response_cache_lock = threading.Lock()
+
+def get_cached_response(key, ttl=STATUS_CACHE_TTL):
+    """返回未过期的缓存响应，没有则返回 None"""
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+    if entry and time.monotonic() - entry['ts'] < ttl:
+        return app.response_class(entry['body'], mimetype='application/json')
+    return None
+
+def cache_response(key, response):
+    """缓存响应体并原样返回响应"""
+    with _response_cache_lock:
+        _response_cache[key] = {'ts': time.monotonic(), 'body': response.get_data()}
+    return response
+
 def clean_string_value(value):
     """清理字符串值"""
     if value is None:
         return ''
     return str(value).strip()
 
+# 时间字段格式 (YYYY-MM-DD HH:MM:SS)，正则一次完成格式匹配并取出各字段
+DATETIME_PATTERN = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2}) (\d{1,2}):(\d{1,2}):(\d{1,2})')
+
+# 同一次上传中时间与数值取值高度重复，缓存解析结果避免重复解析/异常开销
+@lru_cache(maxsize=4096)
+def is_valid_datetime(value):
+    """检查是否是有效的时间格式 (YYYY-MM-DD HH:MM:SS)"""
+    if not value:
+        return False
+    match = DATETIME_PATTERN.fullmatch(value.strip())
+    if not match:
+        return False
+    # 格式匹配后仍需校验日期范围（如 2 月 30 日）
+    # 直接用正则取出的字段构造 datetime，无需 strptime 再解析一遍格式串
+    try:
+        datetime(*map(int, match.groups()))
+        return True
+    except ValueError:
+        return False
+
+@lru_cache(maxsize=4096)
+def safe_convert_int(value):
+    """将字符串数值转换为整数，无效值返回0"""
+    try:
+        return int(float(value)) if value else 0
+    except (ValueError, OverflowError):
+        return 0
+
 def get_issue_by_id(issue_id):
     """从数据库获取议题详细信息"""
     try:
-        query = f"SELECT * FROM issues WHERE id = {issue_id}"
-        result = db_manager.execute_query(query)
+        query = "SELECT * FROM issues WHERE id = %s"
+        result = db_manager.execute_query(query, (issue_id,))
         return result[0] if result else None
     except Exception as e:
         print(f"❌ 获取议题详细信息失败: {str(e)}")
@@ -79,9 +231,12 @@ def sync_issue_to_gitlab(issue_id, action='create'):
 
         # 在同步前，先从GitLab获取当前进度信息并更新到数据库
         gitlab_url = issue_data.get('gitlab_url', '')
-        if gitlab_url and gitlab_url.strip() and gitlab_url.upper() != 'NULL':
+        url_present = has_gitlab_url(gitlab_url)
+        # 只解析一次议题IID，拉取进度与关闭操作共用
+        issue_iid = gitlab_ops.extract_issue_id_from_url(gitlab_url) if url_present else None
+        if url_present:
             print(f"🔄 同步前拉取GitLab进度信息...")
-            progress = gitlab_ops.sync_progress_from_gitlab(gitlab_url)
+            progress = gitlab_ops.sync_progress_from_gitlab(gitlab_url, issue_iid)
             if progress:
                 db_manager.update_issue_progress(issue_id, progress)
                 print(f"✅ 已更新数据库进度信息: {progress}")
@@ -89,6 +244,11 @@ def sync_issue_to_gitlab(issue_id, action='create'):
                 print(f"⚠️ 未能从GitLab获取进度信息，继续执行同步")
 
         if action == 'create':
+            # 已记录GitLab URL说明议题此前已创建（如重复入队的创建任务），直接返回，避免重复创建
+            if url_present:
+                print(f"✅ 议题已关联GitLab议题，跳过创建: {gitlab_url}")
+                return {'success': True, 'gitlab_url': gitlab_url}
+
             # 创建新议题
             print(f"📝 创建 GitLab 议题: {issue_data.get('project_name')}")
             # 传入 full_config 以便创建时使用 labels/mapping 等业务配置
@@ -99,12 +259,12 @@ def sync_issue_to_gitlab(issue_id, action='create'):
             if create_result and create_result.get('success'):
                 gitlab_url = create_result.get('url', '')
                 # 更新数据库中的 gitlab_url
-                update_sql = f"""
+                update_sql = """
                 UPDATE issues
-                SET gitlab_url = '{gitlab_url}', sync_status = 'synced', last_sync_time = NOW()
-                WHERE id = {issue_id}
+                SET gitlab_url = %s, sync_status = 'synced', last_sync_time = NOW()
+                WHERE id = %s
                 """
-                db_manager.execute_update(update_sql)
+                db_manager.execute_update(update_sql, (gitlab_url, issue_id))
                 print(f"✅ GitLab 议题创建成功: {gitlab_url}")
                 return {'success': True, 'gitlab_url': gitlab_url}
             else:
@@ -114,21 +274,20 @@ def sync_issue_to_gitlab(issue_id, action='create'):
 
         elif action == 'close':
             # 关闭议题并移除标签
-            if gitlab_url and gitlab_url.upper() != 'NULL':
+            if url_present:
                 print(f"🔒 关闭 GitLab 议题: {gitlab_url}")
-                issue_iid = gitlab_ops.extract_issue_id_from_url(gitlab_url)
                 if issue_iid:
                     close_ok = gitlab_ops.close_issue(issue_iid, issue_data)
                     if close_ok:
                         # 更新同步状态并清空进度标签
-                        update_sql = f"""
+                        update_sql = """
                         UPDATE issues
                         SET sync_status = 'synced',
                             last_sync_time = NOW(),
                             gitlab_progress = ''
-                        WHERE id = {issue_id}
+                        WHERE id = %s
                         """
-                        db_manager.execute_update(update_sql)
+                        db_manager.execute_update(update_sql, (issue_id,))
                         print(f"✅ GitLab 议题关闭成功，已清空进度标签")
                         return {'success': True}
                     else:
@@ -145,6 +304,62 @@ def sync_issue_to_gitlab(issue_id, action='create'):
         print(f"❌ GitLab 同步异常: {error_msg}")
         return {'success': False, 'error': error_msg}
 
+# 上传路径使用的静态SQL模板（%s 为参数占位符）
+DUPLICATE_RECORD_SQL = """
+SELECT id, project_name, problem_description, status, gitlab_url, created_at
+FROM issues
+WHERE project_name = %s AND problem_description = %s
+ORDER BY created_at ASC
+LIMIT 1
+"""
+
+# 批量查询按键拆成 UNION ALL 的分支：每个分支与 DUPLICATE_RECORD_SQL 一样用 = 比较，
+# 由 MySQL 按列的排序规则判断相等，idx 标明结果行对应的上传键，无需在Python中重新比较字符串
+DUPLICATE_RECORD_BRANCH_SQL = (
+    "SELECT %s AS idx, id, project_name, problem_description, status, gitlab_url, created_at "
+    "FROM issues WHERE project_name = %s AND problem_description = %s"
+)
+ISSUE_ID_BRANCH_SQL = "SELECT %s AS idx, id FROM issues WHERE project_name = %s AND problem_description = %s"
+
+# 同批次待插入记录之间的查重：按 issues 表列的排序规则（见 mysql_config/enhanced_issues_table.sql）比较
+ISSUE_KEY_COLLATION = 'utf8mb4_unicode_ci'
+BATCH_KEY_ROW_SQL = (
+    "SELECT %s AS idx, "
+    f"CONVERT(%s USING utf8mb4) COLLATE {ISSUE_KEY_COLLATION} AS p, "
+    f"CONVERT(%s USING utf8mb4) COLLATE {ISSUE_KEY_COLLATION} AS d"
+)
+BATCH_KEY_DUPLICATES_SQL = """
+SELECT DISTINCT a.idx
+FROM ({a_rows}) a
+JOIN ({b_rows}) b ON a.p = b.p AND a.d = b.d AND b.idx < a.idx
+"""
+
+SYNC_QUEUE_INSERT_PREFIX = "INSERT INTO sync_queue (issue_id, action, priority, metadata, status) VALUES "
+SYNC_QUEUE_ROW_PLACEHOLDER = "(%s, %s, %s, %s, 'pending')"
+SYNC_QUEUE_INSERT_SQL = SYNC_QUEUE_INSERT_PREFIX + SYNC_QUEUE_ROW_PLACEHOLDER
+
+DATABASE_STATS_SQL = """
+SELECT
+    COUNT(*) as total_issues,
+    SUM(CASE WHEN status = 'open' THEN 1 ELSE 0 END) as open_issues,
+    SUM(CASE WHEN status = 'closed' THEN 1 ELSE 0 END) as closed_issues,
+    SUM(CASE WHEN gitlab_url IS NOT NULL AND gitlab_url != '' THEN 1 ELSE 0 END) as synced_issues
+FROM issues
+"""
+
+# (项目名称, 问题描述) 批量查询每条SQL的键数量
+ISSUE_KEY_BATCH_SIZE = 500
+
+@lru_cache(maxsize=32)
+def build_issue_key_sql(branch_sql, key_count, order_by=''):
+    """按键数量把单键查询拼成 UNION ALL，整批大小相同的查询复用同一语句文本"""
+    query = ' UNION ALL '.join([f'({branch_sql})'] * key_count)
+    return f'{query} ORDER BY {order_by}' if order_by else query
+
+def issue_key_params(keys, start=0):
+    """UNION ALL 查询的参数：每个键依次为 (序号, 项目名称, 问题描述)"""
+    return [v for idx, key in enumerate(keys, start) for v in (idx, *key)]
+
 def check_duplicate_record(project_name, problem_description):
     """检查是否存在重复记录"""
     try:
@@ -152,20 +367,7 @@ def check_duplicate_record(project_name, problem_description):
             return None
 
         # 查询是否存在相同的项目名和问题描述，包含 status 和 gitlab_url
-        query = """
-        SELECT id, project_name, problem_description, status, gitlab_url, created_at
-        FROM issues
-        WHERE project_name = %s AND problem_description = %s
-        ORDER BY created_at ASC
-        LIMIT 1
-        """
-
-        # 转义单引号
-        escaped_project_name = project_name.replace("'", "''")
-        escaped_problem_description = problem_description.replace("'", "''")
-
-        formatted_query = query.replace('%s', f"'{escaped_project_name}'", 1).replace('%s', f"'{escaped_problem_description}'", 1)
-        result = db_manager.execute_query(formatted_query)
+        result = db_manager.execute_query(DUPLICATE_RECORD_SQL, (project_name, problem_description))
 
         if result:
             return result[0]  # 返回找到的重复记录
@@ -175,162 +377,206 @@ def check_duplicate_record(project_name, problem_description):
         print(f"❌ 检查重复记录时发生错误: {str(e)}")
         return None
 
-def update_issue_status(issue_id, new_status, record, gitlab_url=None):
-    """更新已存在记录的状态并同步到GitLab"""
+def enqueue_sync_task(issue_id, action, priority, metadata):
+    """将同步失败的议题加入同步队列，稍后重试"""
+    try:
+        if db_manager.execute_update(SYNC_QUEUE_INSERT_SQL, (issue_id, action, priority, json.dumps(metadata, ensure_ascii=False))):
+            print(f"✅ 已添加到同步队列，稍后重试")
+            return True
+        print(f"❌ 添加同步队列失败: 数据库写入失败")
+    except Exception as queue_error:
+        print(f"❌ 添加同步队列失败: {str(queue_error)}")
+    return False
+
+def enqueue_sync_tasks(tasks):
+    """批量将同步失败的议题加入同步队列（多行 INSERT），tasks: [(议题ID, 动作, 优先级, 元数据)]"""
+    if not tasks:
+        return 0
+    rows = [
+        (issue_id, action, priority, json.dumps(metadata, ensure_ascii=False))
+        for issue_id, action, priority, metadata in tasks
+    ]
+    inserted = db_manager.execute_batch_insert(SYNC_QUEUE_INSERT_PREFIX, SYNC_QUEUE_ROW_PLACEHOLDER, rows)
+    if inserted:
+        print(f"✅ 已批量添加 {inserted} 个议题到同步队列，稍后重试")
+    else:
+        print(f"❌ 批量添加同步队列失败: 数据库写入失败")
+    return inserted
+
+# 已存在记录的进程内缓存：WPS客户端每次上传整张表，多数记录与上次相同
+# 只缓存查到的记录（新记录插入后下次上传再查询）；读写缓存都复制记录，并发请求不共享同一字典
+# 状态更新成功后以更新后的记录覆盖缓存
+EXISTING_RECORD_CACHE_SIZE = 10000
+EXISTING_RECORD_CACHE_TTL = 60.0
+_existing_record_cache: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_existing_record_cache_lock = threading.Lock()
+
+def issue_key_digest(key):
+    """(项目名称, 问题描述) 的定长摘要，作为缓存键"""
+    return hashlib.blake2b('\x1f'.join(key).encode('utf-8'), digest_size=16).digest()
+
+def get_cached_records(keys):
+    """返回 (缓存命中的记录, 未命中的键)"""
+    hits = {}
+    misses = []
+    now = time.monotonic()
+    with _existing_record_cache_lock:
+        for key in keys:
+            digest = issue_key_digest(key)
+            entry = _existing_record_cache.get(digest)
+            if entry and now - entry[0] < EXISTING_RECORD_CACHE_TTL:
+                _existing_record_cache.move_to_end(digest)
+                hits[key] = dict(entry[1])
+            else:
+                if entry:
+                    del _existing_record_cache[digest]
+                misses.append(key)
+    return hits, misses
+
+def cache_records(records):
+    """缓存查询到的已存在记录，超出容量时淘汰最久未使用的条目"""
+    now = time.monotonic()
+    with _existing_record_cache_lock:
+        for key, row in records.items():
+            digest = issue_key_digest(key)
+            _existing_record_cache[digest] = (now, dict(row))
+            _existing_record_cache.move_to_end(digest)
+        while len(_existing_record_cache) > EXISTING_RECORD_CACHE_SIZE:
+            _existing_record_cache.popitem(last=False)
+
+def refresh_cached_record(fields, row):
+    """状态更新成功后，用更新后的记录覆盖该上传键的缓存"""
+    cache_records({(fields['project_name'], fields['problem_description']): row})
+
+def find_duplicate_records(keys):
+    """
+    按 (项目名称, 问题描述) 批量查询已存在的记录，一次上传只需少量查询
+    同一键存在多条时与 check_duplicate_record 一致，取最早创建的记录
+    是否相等由 MySQL 按列的排序规则判断（大小写、全半角等），结果行按 idx 对应回上传的键
+    """
+    keys = list({key for key in keys if key[0] and key[1]})
+    duplicates, keys = get_cached_records(keys)
+    found = {}
+    try:
+        for start in range(0, len(keys), ISSUE_KEY_BATCH_SIZE):
+            batch = keys[start:start + ISSUE_KEY_BATCH_SIZE]
+            query = build_issue_key_sql(DUPLICATE_RECORD_BRANCH_SQL, len(batch), 'created_at ASC, id ASC')
+            # 结果按 created_at, id 排序，setdefault 保留每个键最早的记录
+            for row in db_manager.execute_query(query, issue_key_params(batch, start)):
+                found.setdefault(keys[row.pop('idx')], row)
+    except Exception as e:
+        print(f"❌ 批量检查重复记录时发生错误: {str(e)}")
+    cache_records(found)
+    duplicates.update(found)
+    # 不同写法的键匹配到同一条记录时共用同一字典，同批次后续记录能看到前面记录的状态变更
+    rows_by_id = {}
+    for key, row in duplicates.items():
+        duplicates[key] = rows_by_id.setdefault(row['id'], row)
+    return duplicates
+
+def find_batch_duplicates(keys):
+    """
+    返回 keys 中与前面某个键重复的位置集合，相等判断由 MySQL 按 issues 表列的排序规则完成
+    用于同批次新记录之间的查重（数据库中尚无这些记录，无法与表中的行比较）
+    """
+    duplicates = set()
+    if len(keys) < 2:
+        return duplicates
+    # 按 ISSUE_KEY_BATCH_SIZE 分块，每块与自身及之前的每一块各比较一次，单条SQL大小有上限
+    chunks = [(start, keys[start:start + ISSUE_KEY_BATCH_SIZE]) for start in range(0, len(keys), ISSUE_KEY_BATCH_SIZE)]
+    try:
+        for a_start, a_keys in chunks:
+            a_rows = ' UNION ALL '.join([BATCH_KEY_ROW_SQL] * len(a_keys))
+            a_params = issue_key_params(a_keys, a_start)
+            for b_start, b_keys in chunks:
+                if b_start > a_start:
+                    break
+                query = BATCH_KEY_DUPLICATES_SQL.format(
+                    a_rows=a_rows,
+                    b_rows=' UNION ALL '.join([BATCH_KEY_ROW_SQL] * len(b_keys)),
+                )
+                rows = db_manager.execute_query(query, a_params + issue_key_params(b_keys, b_start))
+                duplicates.update(row['idx'] for row in rows)
+    except Exception as e:
+        print(f"❌ 检查同批次重复记录时发生错误: {str(e)}")
+    return duplicates
+
+@lru_cache(maxsize=64)
+def build_status_update_sql(has_actual_time, columns):
+    """按更新字段组合生成状态更新SQL，相同组合复用同一语句文本"""
+    update_fields = [
+        "status = %s",
+        "actual_completion_time = %s" if has_actual_time else "actual_completion_time = NOW()",
+        "sync_status = 'pending'",
+        "updated_at = NOW()"
+    ]
+    update_fields.extend(f"{column} = %s" for column in columns)
+    return f"""
+    UPDATE issues
+    SET
+        {', '.join(update_fields)}
+    WHERE id = %s
+    """
+
+def build_status_update(issue_id, new_status, fields):
+    """
+    构建已存在记录的状态更新语句，返回 (update_sql, update_params, updated_info)
+    fields 为 normalize_issue_record 清理后的字段
+    """
+    # 准备更新的字段
+    actual_completion_time = fields['actual_completion_time']
+    responsible_person = fields['responsible_person']
+    solution = fields['solution']
+    action_record = fields['action_record']
+    remarks = fields['remarks']
+
+    # 处理时间字段
+    has_actual_time = is_valid_datetime(actual_completion_time)
+
+    # 构建参数列表（参数绑定）
+    update_params = [new_status]
+    if has_actual_time:
+        update_params.append(actual_completion_time)
+
+    # 责任人、解决方案、行动记录、备注有值时才更新
+    columns = []
+    for column, value in (
+        ('responsible_person', responsible_person),
+        ('solution', solution),
+        ('action_record', action_record),
+        ('remarks', remarks),
+    ):
+        if value:
+            columns.append(column)
+            update_params.append(value)
+
+    update_sql = build_status_update_sql(has_actual_time, tuple(columns))
+    update_params.append(issue_id)
+
+    updated_info = [f"状态={new_status}"]
+    if responsible_person:
+        updated_info.append(f"责任人={responsible_person}")
+    if solution:
+        updated_info.append("解决方案已更新")
+    if action_record:
+        updated_info.append("行动记录已更新")
+    if remarks:
+        updated_info.append("备注已更新")
+
+    return update_sql, update_params, updated_info
+
+def update_issue_status(issue_id, new_status, fields, gitlab_url=None):
+    """更新已存在记录的状态并同步到GitLab（fields 为 normalize_issue_record 的结果）"""
     try:
         print(f"🔄 更新议题状态: ID={issue_id}, 新状态={new_status}")
 
-        # 准备更新的字段
-        actual_completion_time = clean_string_value(record.get('actual_completion_time', ''))
-        responsible_person = clean_string_value(record.get('responsible_person', ''))
-        solution = clean_string_value(record.get('solution', ''))
-        action_record = clean_string_value(record.get('action_record', ''))
-        remarks = clean_string_value(record.get('remarks', ''))
-
-        # 处理时间字段
-        def is_valid_datetime(value):
-            if not value or value.strip() == '':
-                return False
-            try:
-                from datetime import datetime
-                datetime.strptime(value.strip(), '%Y-%m-%d %H:%M:%S')
-                return True
-            except:
-                return False
-
-        actual_time_sql = f"'{actual_completion_time}'" if is_valid_datetime(actual_completion_time) else 'NOW()'
-
-        # 转义SQL字符串
-        def escape_sql_string(value):
-            return value.replace("'", "''")
-
-        # 构建更新字段列表
-        update_fields = [
-            f"status = '{new_status}'",
-            f"actual_completion_time = {actual_time_sql}",
-            "sync_status = 'pending'",
-            "updated_at = NOW()"
-        ]
-
-        # 如果责任人有值，则更新
-        if responsible_person:
-            update_fields.append(f"responsible_person = '{escape_sql_string(responsible_person)}'")
-
-        # 如果解决方案有值，则更新
-        if solution:
-            update_fields.append(f"solution = '{escape_sql_string(solution)}'")
-
-        # 如果行动记录有值，则更新
-        if action_record:
-            update_fields.append(f"action_record = '{escape_sql_string(action_record)}'")
-
-        # 如果备注有值，则更新
-        if remarks:
-            update_fields.append(f"remarks = '{escape_sql_string(remarks)}'")
-
-        # 构建更新SQL
-        update_sql = f"""
-        UPDATE issues
-        SET
-            {', '.join(update_fields)}
-        WHERE id = {issue_id}
-        """
-
-        print(f"📝 执行状态更新SQL: {update_sql}")
+        update_sql, update_params, updated_info = build_status_update(issue_id, new_status, fields)
+        logger.debug("📝 执行状态更新SQL: %s 参数: %s", update_sql, update_params)
 
         # 执行更新
-        result = db_manager.execute_update(update_sql)
-
-        if result:
-            updated_info = [f"状态={new_status}"]
-            if responsible_person:
-                updated_info.append(f"责任人={responsible_person}")
-            if solution:
-                updated_info.append("解决方案已更新")
-            if action_record:
-                updated_info.append("行动记录已更新")
-            if remarks:
-                updated_info.append("备注已更新")
-
+        if db_manager.execute_update(update_sql, update_params):
             print(f"✅ 议题更新成功: ID={issue_id}, {', '.join(updated_info)}")
-
-            # 如果状态为 closed，立即同步到 GitLab
-            if new_status == 'closed':
-                print(f"🔗 状态已关闭，立即同步到 GitLab")
-
-                # 检查是否已有 GitLab URL（排除 NULL 和空字符串）
-                if gitlab_url and gitlab_url.strip() and gitlab_url.strip().upper() != 'NULL':
-                    print(f"✅ 检测到现有 GitLab URL: {gitlab_url}")
-                    # 已有议题，立即关闭
-                    gitlab_result = sync_issue_to_gitlab(issue_id, action='close')
-                    if gitlab_result.get('success'):
-                        print(f"✅ GitLab 议题已关闭")
-                        return True, "状态更新成功并已关闭GitLab议题"
-                    else:
-                        error_msg = gitlab_result.get('error', '未知错误')
-                        print(f"⚠️ GitLab 议题关闭失败: {error_msg}，添加到同步队列")
-                        # 失败时添加到队列
-                        queue_sql = f"""
-                        INSERT INTO sync_queue (issue_id, action, priority, metadata, status)
-                        VALUES (
-                            {issue_id},
-                            'close',
-                            3,
-                            '{{"remove_labels": ["进度::done"], "error": "{error_msg}"}}',
-                            'pending'
-                        )
-                        """
-                        try:
-                            db_manager.execute_update(queue_sql)
-                            print(f"✅ 已添加到同步队列，稍后重试")
-                        except Exception as queue_error:
-                            print(f"❌ 添加同步队列失败: {str(queue_error)}")
-                else:
-                    # 新规则：无 GitLab URL 且状态为 closed 不创建议题
-                    print("⏭️ 跳过创建议题：无 GitLab URL 且状态为 closed（按新规则不创建）")
-
-            # 如果状态为 paused，立即更新 GitLab 标签为"进度::Pausing"
-            elif new_status == 'paused':
-                print(f"🔗 状态已暂停，立即更新 GitLab 标签")
-
-                # 检查是否已有 GitLab URL（排除 NULL 和空字符串）
-                if gitlab_url and gitlab_url.strip() and gitlab_url.strip().upper() != 'NULL':
-                    print(f"✅ 检测到现有 GitLab URL: {gitlab_url}")
-                    try:
-                        from src.gitlab.core.gitlab_operations import GitLabOperations
-                        gitlab_ops = GitLabOperations()
-                        issue_iid = gitlab_ops.extract_issue_id_from_url(gitlab_url)
-                        if issue_iid:
-                            success = gitlab_ops.update_issue_labels(issue_iid, '进度::Pausing')
-                            if success:
-                                print(f"✅ GitLab 议题标签已更新为'进度::Pausing'")
-                                return True, "状态更新成功并已更新GitLab标签为'进度::Pausing'"
-                            else:
-                                print(f"⚠️ GitLab 议题标签更新失败，添加到同步队列")
-                                queue_sql = f"""
-                                INSERT INTO sync_queue (issue_id, action, priority, metadata, status)
-                                VALUES (
-                                    {issue_id},
-                                    'update',
-                                    2,
-                                    '{{"progress_label": "进度::Pausing", "error": "标签更新失败"}}',
-                                    'pending'
-                                )
-                                """
-                                try:
-                                    db_manager.execute_update(queue_sql)
-                                    print(f"✅ 已添加到同步队列，稍后重试")
-                                except Exception as queue_error:
-                                    print(f"❌ 添加同步队列失败: {str(queue_error)}")
-                        else:
-                            print(f"⚠️ 无法从URL提取议题IID: {gitlab_url}")
-                    except Exception as e:
-                        error_msg = str(e)
-                        print(f"⚠️ 更新GitLab标签异常: {error_msg}")
-                else:
-                    print("⏭️ 无 GitLab URL，跳过标签更新")
-
-            return True, "状态更新成功"
+            return sync_status_change(issue_id, new_status, gitlab_url)
         else:
             print(f"❌ 议题状态更新失败: ID={issue_id}")
             return False, "状态更新失败"
@@ -339,40 +585,133 @@ def update_issue_status(issue_id, new_status, record, gitlab_url=None):
         print(f"❌ 更新议题状态异常: {str(e)}")
         return False, f"状态更新失败: {str(e)}"
 
-def insert_issue_record(record):
-    """插入议题记录到数据库"""
+def sync_status_change(issue_id, new_status, gitlab_url=None):
+    """状态更新写入数据库后，将关闭/暂停同步到GitLab，失败时加入同步队列"""
     try:
-        print(f"🔍 开始插入记录: {record.get('project_name', '未知项目')}")
+        # 如果状态为 closed，立即同步到 GitLab
+        if new_status == 'closed':
+            print(f"🔗 状态已关闭，立即同步到 GitLab")
+
+            # 检查是否已有 GitLab URL（排除 NULL 和空字符串）
+            if has_gitlab_url(gitlab_url):
+                print(f"✅ 检测到现有 GitLab URL: {gitlab_url}")
+                # 已有议题，立即关闭
+                gitlab_result = sync_issue_to_gitlab(issue_id, action='close')
+                if gitlab_result.get('success'):
+                    print(f"✅ GitLab 议题已关闭")
+                    return True, "状态更新成功并已关闭GitLab议题"
+                else:
+                    error_msg = gitlab_result.get('error', '未知错误')
+                    print(f"⚠️ GitLab 议题关闭失败: {error_msg}，添加到同步队列")
+                    # 失败时添加到队列
+                    enqueue_sync_task(issue_id, 'close', 3, {'remove_labels': ['进度::done'], 'error': error_msg})
+            else:
+                # 新规则：无 GitLab URL 且状态为 closed 不创建议题
+                print("⏭️ 跳过创建议题：无 GitLab URL 且状态为 closed（按新规则不创建）")
+
+        # 如果状态为 paused，立即更新 GitLab 标签为"进度::Pausing"
+        elif new_status == 'paused':
+            print(f"🔗 状态已暂停，立即更新 GitLab 标签")
+
+            # 检查是否已有 GitLab URL（排除 NULL 和空字符串）
+            if has_gitlab_url(gitlab_url):
+                print(f"✅ 检测到现有 GitLab URL: {gitlab_url}")
+                try:
+                    from src.gitlab.core.gitlab_operations import GitLabOperations
+                    gitlab_ops = GitLabOperations()
+                    issue_iid = gitlab_ops.extract_issue_id_from_url(gitlab_url)
+                    if issue_iid:
+                        success = gitlab_ops.update_issue_labels(issue_iid, '进度::Pausing')
+                        if success:
+                            print(f"✅ GitLab 议题标签已更新为'进度::Pausing'")
+                            return True, "状态更新成功并已更新GitLab标签为'进度::Pausing'"
+                        else:
+                            print(f"⚠️ GitLab 议题标签更新失败，添加到同步队列")
+                            enqueue_sync_task(issue_id, 'update', 2, {'progress_label': '进度::Pausing', 'error': '标签更新失败'})
+                    else:
+                        print(f"⚠️ 无法从URL提取议题IID: {gitlab_url}")
+                except Exception as e:
+                    error_msg = str(e)
+                    print(f"⚠️ 更新GitLab标签异常: {error_msg}")
+            else:
+                print("⏭️ 无 GitLab URL，跳过标签更新")
+
+        return True, "状态更新成功"
+
+    except Exception as e:
+        print(f"❌ 同步状态变化到GitLab异常: {str(e)}")
+        return True, "状态更新成功"
+
+# 状态映射：WPS状态 -> 数据库状态
+WPS_STATUS_MAPPING = {
+    'C': 'closed',        # C - 完成
+    'O': 'open',          # O - 进行中（提出人状态映射为open）
+    'D': 'delayed',       # D - 延期
+    'N': 'open',          # N - 未开始
+    'P': 'paused'         # P - 暂停
+}
+
+# 上传记录的字段及缺省值
+ISSUE_FIELD_DEFAULTS = (
+    ('project_name', ''), ('problem_category', ''), ('severity_level', '0'),
+    ('problem_description', ''), ('solution', ''), ('action_priority', '0'),
+    ('action_record', ''), ('initiator', ''), ('responsible_person', ''),
+    ('status', 'open'), ('start_time', ''), ('target_completion_time', ''),
+    ('actual_completion_time', ''), ('remarks', ''),
+)
+
+def normalize_issue_record(record):
+    """一次性取出并清理上传记录的全部字段，后续校验、查重、插入和更新共用"""
+    get = record.get
+    return {field: clean_string_value(get(field, default)) for field, default in ISSUE_FIELD_DEFAULTS}
+
+# 新议题批量插入的列顺序与SQL模板
+ISSUE_INSERT_COLUMNS = (
+    'project_name', 'problem_category', 'severity_level', 'problem_description',
+    'solution', 'action_priority', 'action_record', 'initiator', 'responsible_person',
+    'status', 'start_time', 'target_completion_time', 'actual_completion_time',
+    'remarks',
+)
+ISSUE_INSERT_PREFIX = f"INSERT INTO issues ({', '.join(ISSUE_INSERT_COLUMNS)}) VALUES "
+ISSUE_ROW_PLACEHOLDER = '(' + ', '.join(['%s'] * len(ISSUE_INSERT_COLUMNS)) + ')'
+ISSUE_STATUS_INDEX = ISSUE_INSERT_COLUMNS.index('status')
+
+def prepare_issue_record(fields, existing_records=None):
+    """
+    校验并准备议题记录（fields 为 normalize_issue_record 的结果）
+    新记录返回待批量插入的参数元组；状态有变化的重复记录返回待批量更新的状态变更
+    existing_records 为 find_duplicate_records 预查询的结果，未提供时逐条查询
+    返回 (success, message, insert_params, status_update)
+    status_update 为 (议题ID, 原状态, 新状态, gitlab_url, 已存在记录)
+    """
+    try:
+        logger.debug("🔍 开始处理记录: %s", fields['project_name'] or '未知项目')
 
         # 准备数据
-        project_name = clean_string_value(record.get('project_name', ''))
-        problem_category = clean_string_value(record.get('problem_category', ''))
-        severity_level = clean_string_value(record.get('severity_level', '0'))
-        problem_description = clean_string_value(record.get('problem_description', ''))
-        solution = clean_string_value(record.get('solution', ''))
-        action_priority = clean_string_value(record.get('action_priority', '0'))
-        action_record = clean_string_value(record.get('action_record', ''))
-        initiator = clean_string_value(record.get('initiator', ''))
-        responsible_person = clean_string_value(record.get('responsible_person', ''))
+        project_name = fields['project_name']
+        problem_category = fields['problem_category']
+        severity_level = fields['severity_level']
+        problem_description = fields['problem_description']
+        solution = fields['solution']
+        action_priority = fields['action_priority']
+        action_record = fields['action_record']
+        initiator = fields['initiator']
+        responsible_person = fields['responsible_person']
         # 状态映射：WPS状态 -> 数据库状态
-        wps_status = clean_string_value(record.get('status', 'open'))
-        status_mapping = {
-            'C': 'closed',        # C - 完成
-            'O': 'open',          # O - 进行中（提出人状态映射为open）
-            'D': 'delayed',       # D - 延期
-            'N': 'open',          # N - 未开始
-            'P': 'paused'         # P - 暂停
-        }
-        status = status_mapping.get(wps_status.upper(), 'open')
-        start_time = clean_string_value(record.get('start_time', ''))
-        target_completion_time = clean_string_value(record.get('target_completion_time', ''))
-        actual_completion_time = clean_string_value(record.get('actual_completion_time', ''))
-        remarks = clean_string_value(record.get('remarks', ''))
+        wps_status = fields['status']
+        status = WPS_STATUS_MAPPING.get(wps_status.upper(), 'open')
+        start_time = fields['start_time']
+        target_completion_time = fields['target_completion_time']
+        actual_completion_time = fields['actual_completion_time']
+        remarks = fields['remarks']
 
-        print(f"📋 数据准备完成: 项目={project_name}, 分类={problem_category}, 严重程度={severity_level}")
+        logger.debug("📋 数据准备完成: 项目=%s, 分类=%s, 严重程度=%s", project_name, problem_category, severity_level)
 
         # 检查重复记录
-        duplicate_record = check_duplicate_record(project_name, problem_description)
+        if existing_records is None:
+            duplicate_record = check_duplicate_record(project_name, problem_description)
+        else:
+            duplicate_record = existing_records.get((project_name, problem_description))
         if duplicate_record:
             print(f"⚠️ 发现重复记录: 项目={project_name}, 问题描述={problem_description[:50]}...")
             print(f"📋 已存在记录ID: {duplicate_record['id']}, 当前状态: {duplicate_record.get('status', 'unknown')}")
@@ -381,168 +720,210 @@ def insert_issue_record(record):
             issue_id = duplicate_record['id']
             gitlab_url = duplicate_record.get('gitlab_url', '')
 
+            if old_status != status and existing_records is not None:
+                # 预查询结果可能来自缓存，状态变化时以数据库中的最新记录为准
+                latest_record = get_issue_by_id(issue_id)
+                if latest_record:
+                    old_status = latest_record.get('status', '')
+                    gitlab_url = latest_record.get('gitlab_url', '')
+                    duplicate_record['status'] = old_status
+                    duplicate_record['gitlab_url'] = gitlab_url
+
             if old_status != status:
-                # 状态有变化，执行更新
+                # 状态有变化，交由 apply_status_updates 批量更新
                 print(f"🔄 状态变化检测: {old_status} → {status}")
-                success, message = update_issue_status(issue_id, status, record, gitlab_url)
-                if success:
-                    return True, f"状态已更新: {old_status} → {status}"
-                else:
-                    return False, f"状态更新失败: {message}"
+                # 同批次后续的相同记录以更新后的状态比较（更新失败时回退）
+                duplicate_record['status'] = status
+                return True, "待更新", None, (issue_id, old_status, status, gitlab_url, duplicate_record)
             else:
                 # 状态无变化，跳过
                 print(f"⏭️ 状态无变化，跳过记录: {issue_id}")
-                return False, f"重复记录，状态未变化: {issue_id}"
+                return False, f"重复记录，状态未变化: {issue_id}", None, None
 
         # 处理数值字段
-        try:
-            severity_level_int = int(float(severity_level)) if severity_level else 0
-        except:
-            severity_level_int = 0
-
-        try:
-            action_priority_int = int(float(action_priority)) if action_priority else 0
-        except:
-            action_priority_int = 0
+        severity_level_int = safe_convert_int(severity_level)
+        action_priority_int = safe_convert_int(action_priority)
 
-        print(f"🔢 数值转换: 严重程度={severity_level_int}, 优先级={action_priority_int}")
+        logger.debug("🔢 数值转换: 严重程度=%s, 优先级=%s", severity_level_int, action_priority_int)
 
         # 处理时间字段 - 只处理有效的时间格式
-        def is_valid_datetime(value):
-            if not value or value.strip() == '':
-                return False
-            # 检查是否是有效的时间格式 (YYYY-MM-DD HH:MM:SS)
-            try:
-                from datetime import datetime
-                datetime.strptime(value.strip(), '%Y-%m-%d %H:%M:%S')
-                return True
-            except:
-                return False
-
-        start_time_sql = f"'{start_time}'" if is_valid_datetime(start_time) else 'NULL'
-        target_completion_time_sql = f"'{target_completion_time}'" if is_valid_datetime(target_completion_time) else 'NULL'
-        actual_completion_time_sql = f"'{actual_completion_time}'" if is_valid_datetime(actual_completion_time) else 'NULL'
-
-        # 转义单引号
-        def escape_sql_string(value):
-            return value.replace("'", "''")
-
-        # 构建插入SQL
-        insert_sql = f"""
-        INSERT INTO issues (
-            project_name, problem_category, severity_level, problem_description,
-            solution, action_priority, action_record, initiator, responsible_person,
-            status, start_time, target_completion_time, actual_completion_time,
-            remarks
-        ) VALUES (
-            '{escape_sql_string(project_name)}',
-            '{escape_sql_string(problem_category)}',
-            {severity_level_int},
-            '{escape_sql_string(problem_description)}',
-            '{escape_sql_string(solution)}',
-            {action_priority_int},
-            '{escape_sql_string(action_record)}',
-            '{escape_sql_string(initiator)}',
-            '{escape_sql_string(responsible_person)}',
-            '{status}',
-            {start_time_sql},
-            {target_completion_time_sql},
-            {actual_completion_time_sql},
-            '{escape_sql_string(remarks)}'
+        start_time_value = start_time if is_valid_datetime(start_time) else None
+        target_completion_time_value = target_completion_time if is_valid_datetime(target_completion_time) else None
+        actual_completion_time_value = actual_completion_time if is_valid_datetime(actual_completion_time) else None
+
+        # 参数顺序与 ISSUE_INSERT_COLUMNS 一致
+        insert_params = (
+            project_name,
+            problem_category,
+            severity_level_int,
+            problem_description,
+            solution,
+            action_priority_int,
+            action_record,
+            initiator,
+            responsible_person,
+            status,
+            start_time_value,
+            target_completion_time_value,
+            actual_completion_time_value,
+            remarks,
         )
-        """
-
-        print(f"📝 SQL准备完成，长度: {len(insert_sql)} 字符")
-
-        # 执行插入
-        print(f"🚀 开始执行数据库插入...")
-        try:
-            result = db_manager.execute_update(insert_sql)
-            print(f"📊 数据库插入结果: {result}")
+        return True, "待插入", insert_params, None
 
-            if result:
-                print(f"✅ 插入成功: {project_name}")
-
-                # 获取刚插入的记录 ID
-                get_id_sql = f"""
-                SELECT id, created_at FROM issues
-                WHERE project_name = '{escape_sql_string(project_name)}'
-                AND problem_description = '{escape_sql_string(problem_description)}'
-                ORDER BY created_at DESC LIMIT 1
-                """
-                id_result = db_manager.execute_query(get_id_sql)
-
-                if id_result and id_result[0].get('id'):
-                    new_issue_id = id_result[0].get('id')
-                    created_at = id_result[0].get('created_at')
-
-                    # 新规则：不做时间过滤；仅非 closed 状态尝试创建
-                    from datetime import datetime as dt
-                    if isinstance(created_at, str):
-                        try:
-                            created_at = dt.strptime(created_at, '%Y-%m-%d %H:%M:%S')
-                        except Exception:
-                            created_at = None
-
-                    if status != 'closed':
-                        print("🆕 新记录（非closed），立即尝试同步到GitLab")
-                        gitlab_result = sync_issue_to_gitlab(new_issue_id, action='create')
-
-                        if gitlab_result.get('success'):
-                            print(f"✅ GitLab 议题已创建: {gitlab_result.get('gitlab_url')}")
-                            return True, f"插入成功并已同步到GitLab: {gitlab_result.get('gitlab_url')}"
-                        else:
-                            error_msg = gitlab_result.get('error', '未知错误')
-                            print(f"⚠️ GitLab 同步失败: {error_msg}，添加到同步队列")
-                            queue_sql = f"""
-                            INSERT INTO sync_queue (issue_id, action, priority, metadata, status)
-                            VALUES (
-                                {new_issue_id},
-                                'create',
-                                3,
-                                '{{"error": "{error_msg}"}}',
-                                'pending'
-                            )
-                            """
-                            try:
-                                db_manager.execute_update(queue_sql)
-                                print(f"✅ 已添加到同步队列，稍后重试")
-                            except Exception as queue_error:
-                                print(f"❌ 添加同步队列失败: {str(queue_error)}")
-
-                            return True, "插入成功但GitLab同步失败，已添加到队列"
-                    else:
-                        print("⏭️ 新记录为closed状态，按新规则不创建GitLab议题")
-                else:
-                    print(f"⚠️ 无法获取新插入记录的 ID")
+    except Exception as e:
+        print(f"❌ 处理记录异常: {str(e)}")
+        return False, f"插入失败: {str(e)}", None, None
+
+def apply_status_updates(pending_updates):
+    """
+    批量执行已存在记录的状态更新：所有 UPDATE 在同一事务中提交，再逐条同步到GitLab
+    事务失败时退回逐条更新，避免单条异常数据导致整批失败
+    pending_updates: [(序号, 清理后的字段, status_update)]，返回 [(序号, success, message)]
+    """
+    results = []
+    statements = []
+    for _, fields, (issue_id, _, new_status, _, _) in pending_updates:
+        update_sql, update_params, _ = build_status_update(issue_id, new_status, fields)
+        statements.append((update_sql, update_params))
+
+    print(f"🚀 开始批量更新 {len(statements)} 条记录状态...")
+    if db_manager.execute_transaction(statements):
+        for index, fields, (issue_id, old_status, new_status, gitlab_url, duplicate_record) in pending_updates:
+            print(f"✅ 议题更新成功: ID={issue_id}, 状态={new_status}")
+            refresh_cached_record(fields, duplicate_record)
+            sync_status_change(issue_id, new_status, gitlab_url)
+            results.append((index, True, f"状态已更新: {old_status} → {new_status}"))
+        return results
+
+    print("⚠️ 批量状态更新失败，改为逐条更新")
+    for index, fields, (issue_id, old_status, new_status, gitlab_url, duplicate_record) in pending_updates:
+        success, message = update_issue_status(issue_id, new_status, fields, gitlab_url)
+        if success:
+            refresh_cached_record(fields, duplicate_record)
+            results.append((index, True, f"状态已更新: {old_status} → {new_status}"))
+        else:
+            # 本次请求中的记录恢复为数据库中的实际状态
+            duplicate_record['status'] = old_status
+            results.append((index, False, f"状态更新失败: {message}"))
+    return results
+
+def find_issue_ids(keys):
+    """按 (项目名称, 问题描述) 批量查询议题ID，同一键取最新记录，返回 {上传的键: 议题ID}"""
+    issue_ids = {}
+    for start in range(0, len(keys), ISSUE_KEY_BATCH_SIZE):
+        batch = keys[start:start + ISSUE_KEY_BATCH_SIZE]
+        query = build_issue_key_sql(ISSUE_ID_BRANCH_SQL, len(batch))
+        for row in db_manager.execute_query(query, issue_key_params(batch, start)):
+            key = keys[row['idx']]
+            if row['id'] > issue_ids.get(key, 0):
+                issue_ids[key] = row['id']
+    return issue_ids
+
+def sync_new_issue(new_issue_id):
+    """
+    新插入的非closed议题立即同步到GitLab
+    返回 (success, message, 待入队任务)，同步失败时由调用方批量加入同步队列
+    """
+    print("🆕 新记录（非closed），立即尝试同步到GitLab")
+    gitlab_result = sync_issue_to_gitlab(new_issue_id, action='create')
+
+    if gitlab_result.get('success'):
+        print(f"✅ GitLab 议题已创建: {gitlab_result.get('gitlab_url')}")
+        return True, f"插入成功并已同步到GitLab: {gitlab_result.get('gitlab_url')}", None
+
+    error_msg = gitlab_result.get('error', '未知错误')
+    print(f"⚠️ GitLab 同步失败: {error_msg}，添加到同步队列")
+    return True, "插入成功但GitLab同步失败，已添加到队列", (new_issue_id, 'create', 3, {'error': error_msg})
+
+def insert_issue_records(pending_records):
+    """
+    批量插入新议题记录（多行 INSERT），并为非closed记录触发GitLab同步
+    pending_records: [(序号, 清理后的字段, 插入参数)]，返回 [(序号, success, message)]
+    """
+    results = []
+    rows = [insert_params for _, _, insert_params in pending_records]
+
+    print(f"🚀 开始批量插入 {len(rows)} 条新记录...")
+    inserted = db_manager.execute_batch_insert(ISSUE_INSERT_PREFIX, ISSUE_ROW_PLACEHOLDER, rows)
+    print(f"📊 数据库批量插入结果: {inserted}/{len(rows)}")
+
+    # 批量插入在同一事务中提交，失败时整批回滚
+    for index, _, insert_params in pending_records[inserted:]:
+        print(f"❌ 插入失败: {insert_params[0]}")
+        results.append((index, False, "插入失败"))
+
+    inserted_records = pending_records[:inserted]
+    sync_keys = [
+        (insert_params[0], insert_params[3])
+        for _, _, insert_params in inserted_records
+        if insert_params[ISSUE_STATUS_INDEX] != 'closed'
+    ]
+    issue_ids = find_issue_ids(sync_keys) if sync_keys else {}
+
+    sync_tasks = []  # (序号, 新议题ID)
+    for index, _, insert_params in inserted_records:
+        logger.debug("✅ 插入成功: %s", insert_params[0])
+        # 新规则：不做时间过滤；仅非 closed 状态尝试创建
+        if insert_params[ISSUE_STATUS_INDEX] == 'closed':
+            print("⏭️ 新记录为closed状态，按新规则不创建GitLab议题")
+            results.append((index, True, "插入成功"))
+            continue
+
+        new_issue_id = issue_ids.get((insert_params[0], insert_params[3]))
+        if not new_issue_id:
+            print(f"⚠️ 无法获取新插入记录的 ID")
+            results.append((index, True, "插入成功"))
+            continue
+
+        sync_tasks.append((index, new_issue_id))
+
+    # GitLab创建请求以网络等待为主，多条新记录在共享线程池中并发同步
+    if sync_tasks:
+        futures = [(index, _issue_sync_executor.submit(sync_new_issue, new_issue_id)) for index, new_issue_id in sync_tasks]
+        queue_tasks = []
+        for index, future in futures:
+            try:
+                success, message, queue_task = future.result()
+                results.append((index, success, message))
+                if queue_task:
+                    queue_tasks.append(queue_task)
+            except Exception as e:
+                print(f"❌ 同步新记录异常: {str(e)}")
+                results.append((index, True, "插入成功"))
+        # 同步失败的议题合并为一条多行 INSERT 入队
+        enqueue_sync_tasks(queue_tasks)
 
-                return True, "插入成功"
-            else:
-                print(f"❌ 插入失败: {project_name}")
-                return False, "插入失败"
-        except Exception as db_error:
-            print(f"❌ 数据库插入异常: {str(db_error)}")
-            return False, f"插入失败: {str(db_error)}"
+    return results
 
-    except Exception as e:
-        print(f"❌ 插入异常: {str(e)}")
-        return False, f"插入失败: {str(e)}"
+@app.errorhandler(413)
+def request_entity_too_large(error):
+    """请求体超过大小上限"""
+    return jsonify({
+        'success': False,
+        'error': f'请求数据过大，最大允许 {MAX_UPLOAD_BYTES // (1024 * 1024)} MB',
+        'timestamp': datetime.now().isoformat()
+    }), 413
 
 @app.route('/', methods=['GET'])
 def health_check():
     """健康检查"""
-    return jsonify({
+    cached = get_cached_response('health')
+    if cached is not None:
+        return cached
+    return cache_response('health', jsonify({
         'success': True,
         'message': 'WPS上传API服务正常运行',
+        'database': 'connected' if db_manager.ping() else 'disconnected',
         'timestamp': datetime.now().isoformat()
-    })
+    }))
 
 @app.route('/api/wps/upload', methods=['POST'])
 def upload_wps_data():
     """接收WPS表格数据"""
     try:
-        # 获取请求数据
-        data = request.get_json()
+        # 获取请求数据（JSON格式错误时返回400，而不是按服务器异常处理）
+        # 直接解析请求体字节串；cache=False 不在请求对象上保留原始请求体与解析结果的副本
+        data = request.get_json(silent=True, cache=False)
 
         if not data:
             return jsonify({
@@ -560,8 +941,14 @@ def upload_wps_data():
                 'error': '表格数据为空'
             }), 400
 
+        if len(table_data) > MAX_UPLOAD_RECORDS:
+            return jsonify({
+                'success': False,
+                'error': f'单次上传记录过多: {len(table_data)} 条，最多 {MAX_UPLOAD_RECORDS} 条'
+            }), 413
+
         print(f"📤 接收到WPS数据: {len(table_data)} 条记录")
-        print(f"📋 客户端信息: {client_info}")
+        logger.debug("📋 客户端信息: %s", client_info)
 
         # 处理每条记录
         success_count = 0
@@ -574,45 +961,51 @@ def upload_wps_data():
 
         print(f"🔄 开始处理 {len(table_data)} 条记录...")
 
-        for i, record in enumerate(table_data):
+        # 一次遍历完成必填字段校验，汇总输出校验结果
+        invalid_indices = [i for i, record in enumerate(table_data) if not record.get('project_name')]
+        if invalid_indices:
+            errors.extend(f"记录 {i+1}: 项目名称不能为空" for i in invalid_indices)
+            failed_count += len(invalid_indices)
+            logger.debug("❌ 项目名称为空的记录: %s", [i + 1 for i in invalid_indices])
+        invalid_set = set(invalid_indices)
+        print(f"✅ 校验通过 {len(table_data) - len(invalid_indices)}/{len(table_data)} 条记录")
+
+        # 每条记录的字段只清理一次，查重与后续处理共用
+        normalized_records = {
+            i: normalize_issue_record(record)
+            for i, record in enumerate(table_data) if i not in invalid_set
+        }
+
+        # 一次性查询本批次已存在的记录，避免逐条查询重复
+        existing_records = find_duplicate_records([
+            (fields['project_name'], fields['problem_description'])
+            for fields in normalized_records.values()
+        ])
+
+        outcomes = []  # (序号, success, message)
+        pending_records = []  # 待批量插入的新记录: (序号, 清理后的字段, 插入参数)
+        pending_updates = []  # 待批量更新状态的已存在记录: (序号, 清理后的字段, 状态变更)
+        pending_keys = set()
+
+        for i, fields in normalized_records.items():
             try:
-                print(f"📝 处理记录 {i+1}/{len(table_data)}: {record.get('project_name', '未知项目')}")
+                logger.debug("📝 处理记录 %d/%d: %s", i + 1, len(table_data), fields['project_name'])
 
-                # 验证必填字段
-                if not record.get('project_name'):
-                    error_msg = f"记录 {i+1}: 项目名称不能为空"
-                    print(f"❌ {error_msg}")
-                    errors.append(error_msg)
-                    failed_count += 1
+                success, message, insert_params, status_update = prepare_issue_record(fields, existing_records)
+                if status_update is not None:
+                    pending_updates.append((i, fields, status_update))
+                    continue
+                if insert_params is None:
+                    outcomes.append((i, success, message))
                     continue
 
-                # 插入数据库
-                print(f"🚀 开始插入记录 {i+1}...")
-                success, message = insert_issue_record(record)
-                print(f"📊 记录 {i+1} 插入结果: success={success}, message={message}")
-
-                if success:
-                    # 检查是否为状态更新
-                    if '状态已更新' in message:
-                        updated_count += 1
-                        update_msg = f"记录 {i+1}: {message}"
-                        print(f"🔄 {update_msg}")
-                        updated_info.append(update_msg)
-                    else:
-                        success_count += 1
-                        print(f"✅ 记录 {i+1} 处理成功")
-                else:
-                    # 检查是否为重复记录（状态未变化）
-                    if '重复记录' in message or '状态未变化' in message:
-                        skipped_count += 1
-                        skip_msg = f"记录 {i+1}: {message}"
-                        print(f"⏭️  {skip_msg}")
-                        skipped_info.append(skip_msg)
-                    else:
-                        error_msg = f"记录 {i+1}: {message}"
-                        print(f"❌ {error_msg}")
-                        errors.append(error_msg)
-                        failed_count += 1
+                # 同批次内完全相同的记录只插入第一条，写法不同但排序规则下相等的记录稍后由 MySQL 判断
+                key = (insert_params[0], insert_params[3])
+                if key in pending_keys:
+                    outcomes.append((i, False, f"重复记录，同批次已存在: {insert_params[0]}"))
+                    continue
+                pending_keys.add(key)
+                pending_records.append((i, fields, insert_params))
 
             except Exception as e:
                 error_msg = f"记录 {i+1}: 处理异常 - {str(e)}"
@@ -620,12 +1013,58 @@ def upload_wps_data():
                 errors.append(error_msg)
                 failed_count += 1
 
+        # 同批次新记录之间按数据库排序规则查重（如全角/半角括号、大小写不同），只插入第一条
+        batch_duplicates = find_batch_duplicates([
+            (insert_params[0], insert_params[3]) for _, _, insert_params in pending_records
+        ])
+        if batch_duplicates:
+            for position in sorted(batch_duplicates):
+                i, _, insert_params = pending_records[position]
+                outcomes.append((i, False, f"重复记录，同批次已存在: {insert_params[0]}"))
+            pending_records = [
+                record for position, record in enumerate(pending_records) if position not in batch_duplicates
+            ]
+
+        # 状态变化的已存在记录在同一事务中批量更新
+        if pending_updates:
+            outcomes.extend(apply_status_updates(pending_updates))
+
+        # 新记录合并为多行 INSERT 批量写入
+        if pending_records:
+            outcomes.extend(insert_issue_records(pending_records))
+        outcomes.sort(key=lambda outcome: outcome[0])
+
+        for i, success, message in outcomes:
+            logger.debug("📊 记录 %d 处理结果: success=%s, message=%s", i + 1, success, message)
+
+            if success:
+                # 检查是否为状态更新
+                if '状态已更新' in message:
+                    updated_count += 1
+                    update_msg = f"记录 {i+1}: {message}"
+                    print(f"🔄 {update_msg}")
+                    updated_info.append(update_msg)
+                else:
+                    success_count += 1
+                    logger.debug("✅ 记录 %d 处理成功", i + 1)
+            else:
+                # 检查是否为重复记录（状态未变化）
+                if '重复记录' in message or '状态未变化' in message:
+                    skipped_count += 1
+                    skip_msg = f"记录 {i+1}: {message}"
+                    print(f"⏭️  {skip_msg}")
+                    skipped_info.append(skip_msg)
+                else:
+                    error_msg = f"记录 {i+1}: {message}"
+                    print(f"❌ {error_msg}")
+                    errors.append(error_msg)
+                    failed_count += 1
+
         print(f"📊 处理完成: 成功 {success_count} 条, 更新 {updated_count} 条, 跳过 {skipped_count} 条, 失败 {failed_count} 条")
 
-        # 处理待同步队列
-        print(f"🔄 开始处理待同步队列...")
-        queue_result = service_process_pending_sync_queue(db_manager, config_manager)
-        print(f"📊 队列处理结果: 处理 {queue_result['processed']} 个, 成功 {queue_result['success']} 个, 失败 {queue_result['failed']} 个")
+        # 处理待同步队列（后台执行，不阻塞上传请求）
+        sync_job_id = submit_sync_queue_job()
+        print(f"🔄 已提交待同步队列处理任务: {sync_job_id}")
 
         # 返回结果
         result = {
@@ -641,6 +1080,7 @@ def upload_wps_data():
             'errors': errors[:10] if errors else [],  # 只返回前10个真正的错误
             'skipped': skipped_info[:5] if skipped_info else [],  # 返回前5个跳过记录
             'updated': updated_info[:5] if updated_info else [],  # 新增：返回前5个更新记录
+            'sync_job_id': sync_job_id,  # 同步队列后台任务ID，可通过 /api/sync/jobs/<id> 查询
             'timestamp': datetime.now().isoformat()
         }
 
@@ -648,6 +1088,9 @@ def upload_wps_data():
 
         return jsonify(result)
 
+    except HTTPException:
+        # 请求体超限(413)等HTTP错误交给对应的错误处理器返回
+        raise
     except Exception as e:
         error_msg = f"服务器处理异常: {str(e)}"
         print(f"❌ {error_msg}")
@@ -657,25 +1100,44 @@ def upload_wps_data():
             'timestamp': datetime.now().isoformat()
         }), 500
 
+@app.route('/api/sync/jobs/<job_id>', methods=['GET'])
+def get_sync_job_status(job_id):
+    """查询后台同步队列任务状态"""
+    with _sync_jobs_lock:
+        future = _sync_jobs.get(job_id)
+    if future is None:
+        return jsonify({
+            'success': False,
+            'error': f'任务不存在: {job_id}'
+        }), 404
+
+    data: Dict[str, Any] = {'job_id': job_id, 'status': 'running'}
+    if future.done():
+        error = future.exception()
+        if error is not None:
+            data.update({'status': 'failed', 'error': str(error)})
+        else:
+            data.update({'status': 'completed', 'result': future.result()})
+
+    return jsonify({
+        'success': True,
+        'data': data,
+        'timestamp': datetime.now().isoformat()
+    })
+
 @app.route('/api/database/status', methods=['GET'])
 def get_database_status():
     """获取数据库状态"""
+    cached = get_cached_response('database_status', DATABASE_STATUS_CACHE_TTL)
+    if cached is not None:
+        return cached
     try:
         # 查询数据库统计
-        stats_query = """
-        SELECT
-            COUNT(*) as total_issues,
-            SUM(CASE WHEN status = 'open' THEN 1 ELSE 0 END) as open_issues,
-            SUM(CASE WHEN status = 'closed' THEN 1 ELSE 0 END) as closed_issues,
-            SUM(CASE WHEN gitlab_url IS NOT NULL AND gitlab_url != '' THEN 1 ELSE 0 END) as synced_issues
-        FROM issues
-        """
-
-        result = db_manager.execute_query(stats_query)
+        result = db_manager.execute_query(DATABASE_STATS_SQL)
 
         if result:
             stats = result[0]
-            return jsonify({
+            return cache_response('database_status', jsonify({
                 'success': True,
                 'data': {
                     'total_issues': stats.get('total_issues', 0),
@@ -684,7 +1146,7 @@ def get_database_status():
                     'synced_issues': stats.get('synced_issues', 0)
                 },
                 'timestamp': datetime.now().isoformat()
-            })
+            }))
         else:
             return jsonify({
                 'success': False,
@@ -705,6 +1167,7 @@ if __name__ == '__main__':
     print("  - GET  /                   健康检查")
     print("  - POST /api/wps/upload     WPS数据上传")
     print("  - GET  /api/database/status 数据库状态")
+    print("  - GET  /api/sync/jobs/<id> 同步任务状态")
     print("=" * 50)
 
-    app.run(host='0.0.0.0', port=5000, debug=False)
+    app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
@@ -5,10 +5,14 @@
 统一管理所有数据库相关操作
 """
 
-from typing import Dict, List, Optional, Any, Union, cast
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Any, Sequence, Tuple, Union, cast
 
 import mysql.connector
 from mysql.connector import Error as MySQLError
+from mysql.connector import pooling
+from mysql.connector.errors import PoolError
 
 # 数据库配置
 DB_CONFIG: Dict[str, Union[str, int]] = {
@@ -19,31 +23,147 @@ DB_CONFIG: Dict[str, Union[str, int]] = {
     'database': 'issue_database'
 }
 
+# 连接池配置（进程级共享，首次使用时创建）
+DB_POOL_NAME = 'issue_pool'
+DB_POOL_SIZE = 20
+
+# 多行 INSERT 单条语句的行数/字节上限（需小于服务端 max_allowed_packet）
+BATCH_INSERT_MAX_ROWS = 500
+BATCH_INSERT_MAX_BYTES = 1024 * 1024
+
+# 流式查询每次从服务端拉取的行数
+STREAM_FETCH_SIZE = 500
+
+_pool: Optional[pooling.MySQLConnectionPool] = None
+_pool_lock = threading.Lock()
+
+# 连通性检查成功后的缓存时间（秒），并发的健康检查在此期间不再重复 ping
+PING_CACHE_TTL = 2.0
+_last_ping_ok = float('-inf')
+_ping_lock = threading.Lock()
+
+# 线程本地的请求级连接绑定：绑定期间同一线程的所有操作复用同一连接
+_bound = threading.local()
+
+def _connection_kwargs(config: Dict[str, Union[str, int]]) -> Dict[str, Any]:
+    return {
+        'host': str(config['host']),
+        'port': int(config['port']),
+        'user': str(config['user']),
+        'password': str(config['password']),
+        'database': str(config['database']),
+        'autocommit': True,
+    }
+
+def get_connection_pool() -> pooling.MySQLConnectionPool:
+    """
+    获取进程级数据库连接池
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = pooling.MySQLConnectionPool(
+                    pool_name=DB_POOL_NAME,
+                    pool_size=DB_POOL_SIZE,
+                    # 归还连接时不做 COM_RESET_CONNECTION，省去每次借用的额外往返
+                    # （连接上不设置会话变量，事务均在归还前提交或回滚）
+                    pool_reset_session=False,
+                    **_connection_kwargs(DB_CONFIG),
+                )
+    return _pool
+
 class DatabaseManager:
     """数据库管理器"""
 
     def __init__(self):
         self.config = DB_CONFIG
+        # 连接参数只在初始化时构建一次，连接池耗尽时的直连退路直接复用
+        self._connect_kwargs = _connection_kwargs(self.config)
+
+    def _acquire(self):
+        """
+        从连接池获取连接，close() 时归还连接池
+        """
+        try:
+            return get_connection_pool().get_connection()
+        except PoolError:
+            # 连接池耗尽时退回独立连接，避免请求直接失败
+            return mysql.connector.connect(**self._connect_kwargs)
 
     def _connect(self):
-        return mysql.connector.connect(
-            host=str(self.config['host']),
-            port=int(self.config['port']),
-            user=str(self.config['user']),
-            password=str(self.config['password']),
-            database=str(self.config['database']),
-            autocommit=True,
-        )
+        """
+        获取本次操作使用的连接：当前线程已绑定时复用绑定连接（首次使用时才借出）
+        """
+        if getattr(_bound, 'active', False):
+            if _bound.conn is None:
+                _bound.conn = self._acquire()
+            return _bound.conn
+        return self._acquire()
 
-    def execute_query(self, query: str) -> List[Dict[str, Any]]:
+    def _release(self, conn) -> None:
+        """
+        结束一次操作：绑定连接留待 release_connection 统一归还，其余连接立即归还
+        """
+        if conn is not getattr(_bound, 'conn', None):
+            conn.close()
+
+    def bind_connection(self) -> None:
+        """
+        为当前线程开启连接绑定（如一次HTTP请求），之后的操作复用同一连接
+        """
+        # 上一次绑定未正常结束时先归还遗留连接
+        self.release_connection()
+        _bound.active = True
+        _bound.conn = None
+
+    def release_connection(self) -> None:
+        """
+        结束当前线程的连接绑定并归还连接
+        """
+        conn = getattr(_bound, 'conn', None)
+        _bound.active = False
+        _bound.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except MySQLError as e:
+                print(f"⚠️ 归还数据库连接失败: {e}")
+
+    def ping(self) -> bool:
+        """
+        检查数据库连通性（复用连接池连接，断开时自动重连）
+        最近一次成功在 PING_CACHE_TTL 内时直接返回，失败结果不缓存
+        """
+        global _last_ping_ok
+        if time.monotonic() - _last_ping_ok < PING_CACHE_TTL:
+            return True
+        try:
+            with _ping_lock:
+                # 等待锁期间其他线程可能已完成 ping
+                if time.monotonic() - _last_ping_ok < PING_CACHE_TTL:
+                    return True
+                conn = self._connect()
+                try:
+                    conn.ping(reconnect=True, attempts=1, delay=0)
+                    _last_ping_ok = time.monotonic()
+                    return True
+                finally:
+                    self._release(conn)
+        except MySQLError as e:
+            print(f"❌ 数据库连接检查失败: {e}")
+            return False
+
+    def execute_query(self, query: str, params: Optional[Sequence[Any]] = None) -> List[Dict[str, Any]]:
         """
         执行SQL查询并返回结果
+        params 不为空时使用参数绑定（占位符为 %s）
         """
         try:
             conn = self._connect()
             try:
                 cursor = conn.cursor(dictionary=True)
-                cursor.execute(query)
+                cursor.execute(query, params)
                 raw_rows = cursor.fetchall()
                 rows: List[Dict[str, Any]] = cast(List[Dict[str, Any]], raw_rows or [])
                 return rows
@@ -52,20 +172,49 @@ class DatabaseManager:
                     cursor.close()
                 except Exception:
                     pass
-                conn.close()
+                self._release(conn)
         except MySQLError as e:
             print(f"❌ 数据库查询失败: {e}")
             return []
 
-    def execute_update(self, query: str) -> bool:
+    def iter_query(self, query: str, params: Optional[Sequence[Any]] = None,
+                   fetch_size: int = STREAM_FETCH_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        流式执行SQL查询，使用非缓冲游标分批拉取，内存占用与结果集大小无关
+        迭代结束前同一连接上不能执行其他查询
+        """
+        try:
+            conn = self._connect()
+            try:
+                cursor = conn.cursor(dictionary=True, buffered=False)
+                cursor.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(fetch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield cast(Dict[str, Any], row)
+            finally:
+                try:
+                    # 提前退出迭代时丢弃未读结果，避免连接带着残留结果归还
+                    conn.consume_results()
+                    cursor.close()
+                except Exception:
+                    pass
+                self._release(conn)
+        except MySQLError as e:
+            print(f"❌ 数据库查询失败: {e}")
+
+    def execute_update(self, query: str, params: Optional[Sequence[Any]] = None) -> bool:
         """
         执行SQL更新操作
+        params 不为空时使用参数绑定（占位符为 %s）
         """
         try:
             conn = self._connect()
             try:
                 cursor = conn.cursor()
-                cursor.execute(query)
+                cursor.execute(query, params)
                 conn.commit()
                 return True
             finally:
@@ -73,16 +222,161 @@ class DatabaseManager:
                     cursor.close()
                 except Exception:
                     pass
-                conn.close()
+                self._release(conn)
         except MySQLError as e:
             print(f"❌ 数据库更新异常: {e}")
             return False
 
+    def execute_many(self, query: str, params_seq: Sequence[Sequence[Any]]) -> bool:
+        """
+        使用服务端预处理语句批量执行同一条SQL，所有参数组在同一事务中提交
+        任一组执行失败则整体回滚
+        """
+        if not params_seq:
+            return True
+        try:
+            conn = self._connect()
+            try:
+                cursor = conn.cursor(prepared=True)
+                conn.start_transaction()
+                try:
+                    cursor.executemany(query, params_seq)
+                    conn.commit()
+                    return True
+                except Exception:
+                    # 连接归还连接池前必须结束事务
+                    conn.rollback()
+                    raise
+            finally:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+                self._release(conn)
+        except MySQLError as e:
+            print(f"❌ 数据库批量更新异常: {e}")
+            return False
+
+    def _chunk_rows(self, rows: Sequence[Sequence[Any]]):
+        """
+        按行数和估算字节数切分批量数据
+        """
+        chunk: List[Sequence[Any]] = []
+        chunk_bytes = 0
+        for row in rows:
+            row_bytes = sum(len(str(v)) * 3 for v in row if v is not None) + 8 * len(row)
+            if chunk and (len(chunk) >= BATCH_INSERT_MAX_ROWS or chunk_bytes + row_bytes > BATCH_INSERT_MAX_BYTES):
+                yield chunk
+                chunk = []
+                chunk_bytes = 0
+            chunk.append(row)
+            chunk_bytes += row_bytes
+        if chunk:
+            yield chunk
+
+    def execute_transaction(self, statements: Sequence[Tuple[str, Optional[Sequence[Any]]]]) -> bool:
+        """
+        在同一事务中依次执行多条SQL，全部成功后一次提交
+        statements 为 (query, params) 列表，任一失败则整体回滚
+        """
+        if not statements:
+            return True
+        try:
+            conn = self._connect()
+            try:
+                cursor = conn.cursor()
+                conn.start_transaction()
+                try:
+                    for query, params in statements:
+                        cursor.execute(query, params)
+                    conn.commit()
+                    return True
+                except Exception:
+                    # 连接归还连接池前必须结束事务
+                    conn.rollback()
+                    raise
+            finally:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+                self._release(conn)
+        except MySQLError as e:
+            print(f"❌ 数据库事务执行异常: {e}")
+            return False
+
+    def claim_rows(self, select_query: str, params: Optional[Sequence[Any]], claim_query: str) -> List[Dict[str, Any]]:
+        """
+        在同一事务中锁定并认领一批行，返回被认领的行
+        select_query 以 FOR UPDATE 结尾且须返回 id 列；claim_query 中的 {placeholders} 替换为这些 id 的占位符
+        锁定读取总是读到最新提交的数据，并发的认领不会拿到同一行
+        """
+        try:
+            conn = self._connect()
+            try:
+                cursor = conn.cursor(dictionary=True)
+                conn.start_transaction()
+                try:
+                    cursor.execute(select_query, params)
+                    rows = cast(List[Dict[str, Any]], cursor.fetchall() or [])
+                    if rows:
+                        ids = [row['id'] for row in rows]
+                        cursor.execute(claim_query.format(placeholders=', '.join(['%s'] * len(ids))), ids)
+                    conn.commit()
+                    return rows
+                except Exception:
+                    # 连接归还连接池前必须结束事务
+                    conn.rollback()
+                    raise
+            finally:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+                self._release(conn)
+        except MySQLError as e:
+            print(f"❌ 数据库认领任务失败: {e}")
+            return []
+
+    def execute_batch_insert(self, insert_prefix: str, row_placeholder: str,
+                             rows: Sequence[Sequence[Any]]) -> int:
+        """
+        将多行数据合并为 INSERT ... VALUES (...), (...) 分块执行
+        insert_prefix 形如 "INSERT INTO t (a, b) VALUES "，row_placeholder 形如 "(%s, %s)"
+        所有分块在同一事务中提交，返回插入的行数（失败时整体回滚并返回 0）
+        """
+        if not rows:
+            return 0
+        try:
+            conn = self._connect()
+            try:
+                cursor = conn.cursor()
+                conn.start_transaction()
+                try:
+                    for chunk in self._chunk_rows(rows):
+                        query = insert_prefix + ', '.join([row_placeholder] * len(chunk))
+                        cursor.execute(query, [v for row in chunk for v in row])
+                    conn.commit()
+                    return len(rows)
+                except Exception:
+                    # 连接归还连接池前必须结束事务
+                    conn.rollback()
+                    raise
+            finally:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+                self._release(conn)
+        except MySQLError as e:
+            print(f"❌ 数据库批量插入异常: {e}")
+            return 0
+
     def get_issues_without_gitlab_url(self, limit: int = 20) -> List[Dict[str, Any]]:
         """
         获取没有GitLab URL的议题
         """
-        query = f"""
+        query = """
         SELECT id, project_name, problem_category, severity_level, problem_description,
                solution, action_priority, action_record, initiator, responsible_person,
                status, start_time, target_completion_time, actual_completion_time,
@@ -92,9 +386,9 @@ class DatabaseManager:
         AND status = 'open'
         AND (sync_status IS NULL OR sync_status = 'pending' OR sync_status = 'failed')
         ORDER BY id
-        LIMIT {limit};
+        LIMIT %s
         """
-        return self.execute_query(query)
+        return self.execute_query(query, (int(limit),))
 
     def get_issues_with_gitlab_url(self) -> List[Dict[str, Any]]:
         """
@@ -109,31 +403,83 @@ class DatabaseManager:
         """
         return self.execute_query(query)
 
+    def iter_linked_issue_iids(self) -> Iterator[int]:
+        """
+        流式遍历已关联议题的GitLab议题IID，由MySQL从 gitlab_url 中截取 /-/issues/ 之后的数字
+        （兼容 MySQL 5.7，不依赖 REGEXP_SUBSTR；带锚点等后缀时 CAST 取前导数字）
+        """
+        query = """
+        SELECT CAST(SUBSTRING_INDEX(gitlab_url, '/-/issues/', -1) AS UNSIGNED) AS issue_iid
+        FROM issues
+        WHERE gitlab_url LIKE '%/-/issues/%'
+        """
+        for row in self.iter_query(query):
+            if row['issue_iid']:
+                yield int(row['issue_iid'])
+
     def update_issue_gitlab_info(self, issue_id: int, gitlab_url: str,
                                 gitlab_progress: str = '', sync_status: str = 'synced') -> bool:
         """
         更新议题的GitLab信息
         """
-        query = f"""
+        query = """
         UPDATE issues SET
-            gitlab_url = '{gitlab_url}',
-            gitlab_progress = '{gitlab_progress}',
-            sync_status = '{sync_status}',
+            gitlab_url = %s,
+            gitlab_progress = %s,
+            sync_status = %s,
             last_sync_time = CURRENT_TIMESTAMP
-        WHERE id = {issue_id};
+        WHERE id = %s
         """
-        return self.execute_update(query)
+        return self.execute_update(query, (gitlab_url, gitlab_progress, sync_status, issue_id))
 
     def update_issue_progress(self, issue_id: int, gitlab_progress: str) -> bool:
         """
         更新议题进度
         """
-        query = f"""
+        query = """
         UPDATE issues SET
-            gitlab_progress = '{gitlab_progress}'
-        WHERE id = {issue_id};
+            gitlab_progress = %s
+        WHERE id = %s
         """
-        return self.execute_update(query)
+        return self.execute_update(query, (gitlab_progress, issue_id))
+
+    def update_issues_progress(self, progress_by_id: Dict[int, str]) -> bool:
+        """
+        批量更新多个议题的进度：每块一条 UPDATE ... CASE id WHEN，所有分块在同一事务中提交
+        """
+        return self.execute_transaction(self.build_progress_update_statements(progress_by_id))
+
+    def build_progress_update_statements(self, progress_by_id: Dict[int, str]) -> List[Tuple[str, Optional[Sequence[Any]]]]:
+        """
+        生成批量更新进度的语句列表，供调用方与其他语句合并到同一事务
+        """
+        items = list(progress_by_id.items())
+        statements: List[Tuple[str, Optional[Sequence[Any]]]] = []
+        for start in range(0, len(items), BATCH_INSERT_MAX_ROWS):
+            chunk = items[start:start + BATCH_INSERT_MAX_ROWS]
+            cases = " ".join(["WHEN %s THEN %s"] * len(chunk))
+            id_placeholders = ", ".join(["%s"] * len(chunk))
+            query = f"UPDATE issues SET gitlab_progress = CASE id {cases} END WHERE id IN ({id_placeholders})"
+            params: List[Any] = [v for item in chunk for v in item]
+            params.extend(issue_id for issue_id, _ in chunk)
+            statements.append((query, params))
+        return statements
+
+    def bulk_clear_gitlab_urls(self, issue_ids: Sequence[int]) -> bool:
+        """
+        批量清除无效的GitLab URL并重置同步状态：每块一条 UPDATE ... WHERE id IN
+        """
+        ids = list(issue_ids)
+        statements: List[Tuple[str, Optional[Sequence[Any]]]] = []
+        for start in range(0, len(ids), BATCH_INSERT_MAX_ROWS):
+            chunk = ids[start:start + BATCH_INSERT_MAX_ROWS]
+            id_placeholders = ", ".join(["%s"] * len(chunk))
+            query = (
+                "UPDATE issues SET gitlab_url = NULL, sync_status = 'pending', "
+                f"last_sync_time = NULL, gitlab_progress = NULL WHERE id IN ({id_placeholders})"
+            )
+            statements.append((query, chunk))
+        return self.execute_transaction(statements)
 
     def get_pending_queue_items(self) -> List[Dict[str, Any]]:
         """
@@ -152,38 +498,42 @@ class DatabaseManager:
         """
         更新队列项状态
         """
-        error_sql = f", error_message = '{error_message}'" if error_message else ""
+        error_sql = ", error_message = %s" if error_message else ""
         query = f"""
         UPDATE sync_queue SET
-            status = '{status}',
+            status = %s,
             processed_at = NOW(){error_sql}
-        WHERE id = {queue_id};
+        WHERE id = %s
         """
-        return self.execute_update(query)
+        params: List[Any] = [status]
+        if error_message:
+            params.append(error_message)
+        params.append(queue_id)
+        return self.execute_update(query, params)
 
     def add_to_sync_queue(self, issue_id: int, action: str) -> bool:
         """
         添加项目到同步队列
         """
-        query = f"""
+        query = """
         INSERT INTO sync_queue (issue_id, action, created_at)
-        VALUES ({issue_id}, '{action}', NOW());
+        VALUES (%s, %s, NOW())
         """
-        return self.execute_update(query)
+        return self.execute_update(query, (issue_id, action))
 
     def get_issue_by_id(self, issue_id: int) -> Optional[Dict[str, Any]]:
         """
         根据ID获取议题
         """
-        query = f"""
+        query = """
         SELECT id, project_name, problem_category, severity_level, problem_description,
                solution, action_priority, action_record, initiator, responsible_person,
                status, start_time, target_completion_time, actual_completion_time,
                remarks, gitlab_url, sync_status, last_sync_time, gitlab_progress
         FROM issues
-        WHERE id = {issue_id};
+        WHERE id = %s
         """
-        results = self.execute_query(query)
+        results = self.execute_query(query, (issue_id,))
         return results[0] if results else None
 
     def update_issue(self, issue_id: int, **kwargs) -> bool:
@@ -191,14 +541,13 @@ class DatabaseManager:
         更新议题信息
         """
         try:
-            # 构建更新字段
+            # 构建更新字段（列名来自调用方代码，取值使用参数绑定）
             update_fields = []
+            params: List[Any] = []
             for key, value in kwargs.items():
                 if value is not None:
-                    if isinstance(value, str):
-                        update_fields.append(f"{key} = '{value}'")
-                    else:
-                        update_fields.append(f"{key} = {value}")
+                    update_fields.append(f"{key} = %s")
+                    params.append(value)
 
             if not update_fields:
                 return True
@@ -209,10 +558,11 @@ class DatabaseManager:
             query = f"""
             UPDATE issues SET
                 {', '.join(update_fields)}
-            WHERE id = {issue_id};
+            WHERE id = %s
             """
+            params.append(issue_id)
 
-            return self.execute_update(query)
+            return self.execute_update(query, params)
         except Exception as e:
             print(f"❌ 更新议题失败: {e}")
             return False
@@ -6,8 +6,23 @@
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, List, Optional, Any, cast
 
+# 模块级HTTP会话：复用连接池与TLS会话，避免每次查询用户都重新建立连接
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=(502, 503, 504), allowed_methods=frozenset(['GET'])),
+)
+SESSION.mount('https://', _adapter)
+SESSION.mount('http://', _adapter)
+
+# 多人责任人的分隔符（按顺序匹配第一个出现的）
+ASSIGNEE_SEPARATORS = ('/', '、', ',', '，', ';', '；')
+
 def find_user_mapping(name: str, user_mapping: Dict[str, str]) -> Optional[str]:
     """智能查找用户映射"""
     # 直接匹配
@@ -39,10 +54,9 @@ def get_assignee_ids(manager, responsible_person: str, user_mapping: Dict[str, s
         assignee_ids = []
 
         # 检查是否包含分隔符（支持多种分隔符）
-        separators = ['/', '、', ',', '，', ';', '；']
         person_list = [responsible_person]
 
-        for sep in separators:
+        for sep in ASSIGNEE_SEPARATORS:
             if sep in responsible_person:
                 person_list = [p.strip() for p in responsible_person.split(sep)]
                 print(f"🔍 检测到多人责任人: '{responsible_person}' (分隔符: '{sep}')")
@@ -90,7 +104,7 @@ def get_user_id_by_username(manager, username: str) -> Optional[int]:
     try:
         url = f"{manager.gitlab_url}/api/v4/users"
         params = {'username': username}
-        response = requests.get(url, headers=manager.headers, params=params)
+        response = SESSION.get(url, headers=manager.headers, params=params, timeout=30)
 
         if response.status_code == 200:
             users = response.json()
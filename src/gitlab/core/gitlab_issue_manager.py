@@ -7,12 +7,40 @@ GitLab 议题管理工具
 """
 
 import os
+import threading
+from collections import OrderedDict
 from typing import cast
 import json
-import urllib.request
-import urllib.parse
-from urllib.error import URLError, HTTPError
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 模块级HTTP会话：所有 GitLabIssueManager 实例共享连接池，复用 TCP/TLS 连接
+# 只对幂等的 GET 请求自动重试（含 429 限流，按 Retry-After 等待），创建/更新议题失败时由调用方决定是否重试
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=frozenset(['GET']),
+        respect_retry_after_header=True,
+    ),
+)
+SESSION.mount('https://', _adapter)
+SESSION.mount('http://', _adapter)
+
+# GitLab 列表接口单页上限
+LIST_ISSUES_MAX_PER_PAGE = 100
+
+# 议题详情的 ETag 缓存：{API地址: (ETag, 议题)}，再次获取时发送 If-None-Match，304 时复用缓存的议题
+ETAG_CACHE_SIZE = 2048
+_etag_cache: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+_etag_cache_lock = threading.Lock()
 
 class GitLabIssueManager:
     def __init__(self, gitlab_url: str, private_token: str) -> None:
@@ -25,6 +53,48 @@ class GitLabIssueManager:
             'Content-Type': 'application/json'
         }
 
+    def _request(self, method: str, api_url: str, action: str, data: Optional[Dict[str, Any]] = None,
+                 params: Any = None, show_error_body: bool = False, use_etag: bool = False) -> Any:
+        """
+        通过共享会话发送请求并解析JSON响应，失败时打印错误并返回 None
+        use_etag=True 时发送条件请求，资源未变化（304）直接返回上次的结果
+        """
+        try:
+            body = json.dumps(data).encode('utf-8') if data is not None else None
+            headers = self.headers
+            cached = None
+            if use_etag:
+                with _etag_cache_lock:
+                    cached = _etag_cache.get(api_url)
+                    if cached:
+                        _etag_cache.move_to_end(api_url)
+                if cached:
+                    headers = {**self.headers, 'If-None-Match': cached[0]}
+            resp = SESSION.request(method, api_url, headers=headers, params=params, data=body, timeout=30)
+            if cached and resp.status_code == 304:
+                return cached[1]
+            if resp.status_code >= 400:
+                print(f"❌ {action}时发生错误: HTTP {resp.status_code}")
+                if show_error_body:
+                    print(resp.text)
+                return None
+            # json.loads 直接解析字节串，省去整段响应的 decode 拷贝
+            result = json.loads(resp.content)
+            etag = resp.headers.get('ETag') if use_etag else None
+            if etag:
+                with _etag_cache_lock:
+                    _etag_cache[api_url] = (etag, result)
+                    _etag_cache.move_to_end(api_url)
+                    if len(_etag_cache) > ETAG_CACHE_SIZE:
+                        _etag_cache.popitem(last=False)
+            return result
+        except requests.RequestException as e:
+            print(f"❌ {action}网络错误: {e}")
+            return None
+        except Exception as e:
+            print(f"❌ {action}异常: {e}")
+            return None
+
     def create_issue(self, project_id: int, title: str, description: Optional[str] = None,
                     assignee_ids: Optional[List[int]] = None, milestone_id: Optional[int] = None,
                     labels: Optional[List[str]] = None, due_date: Optional[str] = None,
@@ -48,36 +118,18 @@ class GitLabIssueManager:
         if weight:
             data['weight'] = weight
 
-        try:
-            req = urllib.request.Request(api_url, method='POST')
-            for k, v in self.headers.items():
-                req.add_header(k, v)
-            body = json.dumps(data).encode('utf-8')
-            with urllib.request.urlopen(req, body, timeout=30) as resp:
-                resp_body = resp.read().decode('utf-8')
-                result = cast(Dict[str, Any], json.loads(resp_body))
-                return result
-        except HTTPError as e:
-            print(f"❌ 创建议题时发生错误: HTTP {e.code}")
-            try:
-                print(e.read().decode('utf-8'))
-            except Exception:
-                pass
-            return None
-        except URLError as e:
-            print(f"❌ 创建议题网络错误: {e}")
-            return None
-        except Exception as e:
-            print(f"❌ 创建议题异常: {e}")
-            return None
+        return cast(Optional[Dict[str, Any]],
+                    self._request('POST', api_url, '创建议题', data=data, show_error_body=True))
 
     def update_issue(self, project_id: int, issue_iid: int, title: Optional[str] = None,
                     description: Optional[str] = None, assignee_ids: Optional[List[int]] = None,
                     milestone_id: Optional[int] = None, labels: Optional[List[str]] = None,
                     due_date: Optional[str] = None, weight: Optional[int] = None,
-                    state_event: Optional[str] = None) -> Optional[Dict[str, Any]]:
+                    state_event: Optional[str] = None,
+                    remove_labels: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
         """
         更新 GitLab 议题
+        remove_labels 只移除指定标签，无需先获取并回传完整标签列表
         """
         api_url = f"{self.gitlab_url}/api/v4/projects/{project_id}/issues/{issue_iid}"
 
@@ -92,6 +144,8 @@ class GitLabIssueManager:
             data['milestone_id'] = milestone_id
         if labels:
             data['labels'] = ','.join(labels)
+        if remove_labels:
+            data['remove_labels'] = ','.join(remove_labels)
         if due_date:
             data['due_date'] = due_date
         if weight:
@@ -99,28 +153,8 @@ class GitLabIssueManager:
         if state_event:
             data['state_event'] = state_event
 
-        try:
-            req = urllib.request.Request(api_url, method='PUT')
-            for k, v in self.headers.items():
-                req.add_header(k, v)
-            body = json.dumps(data).encode('utf-8')
-            with urllib.request.urlopen(req, body, timeout=30) as resp:
-                resp_body = resp.read().decode('utf-8')
-                result = cast(Dict[str, Any], json.loads(resp_body))
-                return result
-        except HTTPError as e:
-            print(f"❌ 更新议题时发生错误: HTTP {e.code}")
-            try:
-                print(e.read().decode('utf-8'))
-            except Exception:
-                pass
-            return None
-        except URLError as e:
-            print(f"❌ 更新议题网络错误: {e}")
-            return None
-        except Exception as e:
-            print(f"❌ 更新议题异常: {e}")
-            return None
+        return cast(Optional[Dict[str, Any]],
+                    self._request('PUT', api_url, '更新议题', data=data, show_error_body=True))
 
     def close_issue(self, project_id: int, issue_iid: int) -> Optional[Dict[str, Any]]:
         """
@@ -139,24 +173,7 @@ class GitLabIssueManager:
         获取议题详情
         """
         api_url = f"{self.gitlab_url}/api/v4/projects/{project_id}/issues/{issue_iid}"
-
-        try:
-            req = urllib.request.Request(api_url, method='GET')
-            for k, v in self.headers.items():
-                req.add_header(k, v)
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                resp_body = resp.read().decode('utf-8')
-                result = cast(Dict[str, Any], json.loads(resp_body))
-                return result
-        except HTTPError as e:
-            print(f"❌ 获取议题详情时发生错误: HTTP {e.code}")
-            return None
-        except URLError as e:
-            print(f"❌ 获取议题详情网络错误: {e}")
-            return None
-        except Exception as e:
-            print(f"❌ 获取议题详情异常: {e}")
-            return None
+        return cast(Optional[Dict[str, Any]], self._request('GET', api_url, '获取议题详情', use_etag=True))
 
     def list_issues(self, project_id: int, state: str = 'opened', per_page: int = 20) -> Optional[List[Dict[str, Any]]]:
         """
@@ -167,56 +184,55 @@ class GitLabIssueManager:
             'state': state,
             'per_page': per_page
         }
+        return cast(Optional[List[Dict[str, Any]]], self._request('GET', api_url, '获取议题列表', params=params))
 
-        try:
-            url = api_url + '?' + urllib.parse.urlencode(params)
-            req = urllib.request.Request(url, method='GET')
-            for k, v in self.headers.items():
-                req.add_header(k, v)
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                resp_body = resp.read().decode('utf-8')
-                result = cast(List[Dict[str, Any]], json.loads(resp_body))
-                return result
-        except HTTPError as e:
-            print(f"❌ 获取议题列表时发生错误: HTTP {e.code}")
-            return None
-        except URLError as e:
-            print(f"❌ 获取议题列表网络错误: {e}")
-            return None
-        except Exception as e:
-            print(f"❌ 获取议题列表异常: {e}")
-            return None
+    def list_issues_by_iids(self, project_id: int, iids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        按 iids[] 批量获取议题，每100个一次列表请求，返回 {iid: 议题}
+        """
+        api_url = f"{self.gitlab_url}/api/v4/projects/{project_id}/issues"
+        unique_iids = list(dict.fromkeys(iids))
+        issues_by_iid: Dict[int, Dict[str, Any]] = {}
+        for start in range(0, len(unique_iids), LIST_ISSUES_MAX_PER_PAGE):
+            chunk = unique_iids[start:start + LIST_ISSUES_MAX_PER_PAGE]
+            params: List[Tuple[str, Union[str, int]]] = [('iids[]', iid) for iid in chunk]
+            params.extend([('state', 'all'), ('per_page', LIST_ISSUES_MAX_PER_PAGE)])
+            issues = self._request('GET', api_url, '批量获取议题', params=params)
+            for issue in issues or []:
+                issues_by_iid[issue['iid']] = issue
+        return issues_by_iid
 
     def get_project_info(self, project_id: int) -> Optional[Dict[str, Any]]:
         """
         获取项目信息
         """
         api_url = f"{self.gitlab_url}/api/v4/projects/{project_id}"
+        return cast(Optional[Dict[str, Any]], self._request('GET', api_url, '获取项目信息'))
 
-        try:
-            req = urllib.request.Request(api_url, method='GET')
-            for k, v in self.headers.items():
-                req.add_header(k, v)
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                resp_body = resp.read().decode('utf-8')
-                result = cast(Dict[str, Any], json.loads(resp_body))
-                return result
-        except HTTPError as e:
-            print(f"❌ 获取项目信息时发生错误: HTTP {e.code}")
-            return None
-        except URLError as e:
-            print(f"❌ 获取项目信息网络错误: {e}")
-            return None
-        except Exception as e:
-            print(f"❌ 获取项目信息异常: {e}")
-            return None
+# 成功加载的配置缓存（进程内），加载失败不缓存以便下次调用重试
+_config_cache: Optional[Dict[str, Any]] = None
 
 def load_config() -> Optional[Dict[str, Any]]:
     """
-    加载 GitLab 配置，从 wps_gitlab_config.json 加载。
-    系统环境变量优先级最高（如果设置了）。
+    加载 GitLab 配置，首次成功加载后复用缓存，返回副本以免调用方修改缓存。
+    配置文件或环境变量在运行时变更后需调用 clear_config_cache()。
     返回统一键名: gitlab_url/private_token/project_id/project_path
     """
+    global _config_cache
+    if _config_cache is None:
+        _config_cache = _read_config()
+    return dict(_config_cache) if _config_cache else None
+
+def clear_config_cache() -> None:
+    """清除 load_config 的缓存，下次调用重新读取配置"""
+    global _config_cache
+    _config_cache = None
+
+def _read_config() -> Optional[Dict[str, Any]]:
+    """
+    从 wps_gitlab_config.json 读取 GitLab 配置。
+    系统环境变量优先级最高（如果设置了）。
+    """
     # 优先：系统环境变量
     gitlab_url = os.getenv('GITLAB_URL', '')
     private_token = os.getenv('GITLAB_PRIVATE_TOKEN', '')
@@ -6,11 +6,55 @@ GitLab操作核心模块
 """
 
 import re
-from typing import Dict, Optional, Any, List
+import time
+from typing import Dict, Optional, Any, List, Tuple
 from datetime import datetime
 
 from src.gitlab.core.gitlab_issue_manager import GitLabIssueManager, load_config
 
+# GitLab议题URL中的内部ID (iid)
+ISSUE_IID_PATTERN = re.compile(r'/-/issues/(\d+)')
+
+def extract_issue_iid(gitlab_url: Optional[str]) -> Optional[int]:
+    """从GitLab议题URL中提取内部ID (iid)，以 /-/issues/<数字> 结尾的常见URL不经过正则"""
+    if not gitlab_url:
+        return None
+    tail = gitlab_url.rpartition('/-/issues/')[2]
+    if tail.isascii() and tail.isdigit():
+        return int(tail)
+    # 带锚点、查询参数等后缀的URL回退到正则
+    match = ISSUE_IID_PATTERN.search(gitlab_url)
+    if match:
+        return int(match.group(1))
+    return None
+
+# 数据库中表示"没有GitLab URL"的取值（统一大写比较）
+EMPTY_GITLAB_URL_VALUES = frozenset({'', 'NULL'})
+
+def has_gitlab_url(gitlab_url: Optional[str]) -> bool:
+    """判断gitlab_url是否为有效值（排除空值、空白与 'NULL' 字符串）"""
+    return bool(gitlab_url) and gitlab_url.strip().upper() not in EMPTY_GITLAB_URL_VALUES
+
+# 议题详情缓存时间（秒）：同一次同步中先拉取进度再关闭/更新标签时复用，不重复请求
+ISSUE_CACHE_TTL = 30.0
+
+# 进度标签前缀与默认进度
+PROGRESS_LABEL_PREFIX = '进度::'
+DEFAULT_PROGRESS_LABEL = '进度::To do'
+
+# 议题没有进度标签时按GitLab状态推断的进度
+STATE_PROGRESS_MAPPING = {
+    'opened': DEFAULT_PROGRESS_LABEL
+}
+
+def first_progress_label(labels: List[Any]) -> Optional[str]:
+    """返回标签列表中的第一个进度标签，没有时返回None"""
+    return next((str(label) for label in labels if str(label).startswith(PROGRESS_LABEL_PREFIX)), None)
+
+def without_progress_labels(labels: List[Any]) -> List[Any]:
+    """返回移除所有进度标签后的标签列表"""
+    return [label for label in labels if not str(label).startswith(PROGRESS_LABEL_PREFIX)]
+
 class GitLabOperations:
     """GitLab操作管理器"""
 
@@ -24,40 +68,34 @@ class GitLabOperations:
             self.config['private_token']
         )
         self.project_id = int(self.config['project_id'])
+        # {iid: (获取时间, 议题)}，本实例更新议题后以返回的最新议题覆盖
+        self._issue_cache: Dict[int, Tuple[float, Dict[str, Any]]] = {}
 
     def extract_issue_id_from_url(self, gitlab_url: str) -> Optional[int]:
         """
         从GitLab URL中提取议题的内部ID (iid)
         """
-        match = re.search(r'/-/issues/(\d+)', gitlab_url)
-        if match:
-            return int(match.group(1))
-        return None
+        return extract_issue_iid(gitlab_url)
 
     def get_issue_progress(self, gitlab_issue: Dict[str, Any]) -> str:
         """
         从GitLab议题中提取进度信息
         """
         try:
-            labels = gitlab_issue.get('labels', [])
-
             # 查找进度标签
-            for label in labels:
-                if str(label).startswith('进度::'):
-                    return str(label)
+            progress = first_progress_label(gitlab_issue.get('labels', []))
+            if progress is not None:
+                return progress
 
             # 根据状态推断进度（closed状态不返回进度标签）
             state = gitlab_issue.get('state', 'opened')
             if state == 'closed':
                 return ''
-            state_mapping = {
-                'opened': '进度::To do'
-            }
-            return str(state_mapping.get(state, '进度::To do'))
+            return str(STATE_PROGRESS_MAPPING.get(state, DEFAULT_PROGRESS_LABEL))
 
         except Exception:
             # 确保函数返回值为 str，避免返回 Any 被类型检查标注
-            return '进度::To do'
+            return DEFAULT_PROGRESS_LABEL
 
     def close_issue(self, issue_iid: int, issue_data: Dict[str, Any]) -> bool:
         """
@@ -68,7 +106,7 @@ class GitLabOperations:
             current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
             # 获取原始描述
-            gitlab_issue = self.manager.get_issue(self.project_id, issue_iid)
+            gitlab_issue = self.get_issue(issue_iid)
             if not gitlab_issue:
                 return False
 
@@ -94,19 +132,20 @@ class GitLabOperations:
             # 合并描述
             new_description = (original_description or '') + close_info
 
-            # 获取当前标签并移除进度标签
-            current_labels = gitlab_issue.get('labels', [])
-            updated_labels = [label for label in current_labels if not label.startswith('进度::')]
+            # 只移除进度标签，不回传完整标签列表（移除后没有剩余标签时也能生效）
+            progress_labels = [str(label) for label in gitlab_issue.get('labels', [])
+                               if str(label).startswith(PROGRESS_LABEL_PREFIX)]
 
             # 更新议题（关闭并更新描述和标签）
             updated_issue = self.manager.update_issue(
                 project_id=self.project_id,
                 issue_iid=issue_iid,
                 description=new_description,
-                labels=updated_labels,
+                remove_labels=progress_labels,
                 state_event='close'
             )
 
+            self._cache_updated_issue(issue_iid, updated_issue)
             return updated_issue is not None
 
         except Exception as e:
@@ -115,9 +154,35 @@ class GitLabOperations:
 
     def get_issue(self, issue_iid: int) -> Optional[Dict[str, Any]]:
         """
-        获取GitLab议题
+        获取GitLab议题，ISSUE_CACHE_TTL 内重复获取同一议题时使用缓存
+        """
+        cached = self._issue_cache.get(issue_iid)
+        if cached and time.monotonic() - cached[0] < ISSUE_CACHE_TTL:
+            return cached[1]
+        gitlab_issue = self.manager.get_issue(self.project_id, issue_iid)
+        if gitlab_issue:
+            self._issue_cache[issue_iid] = (time.monotonic(), gitlab_issue)
+        return gitlab_issue
+
+    def _cache_updated_issue(self, issue_iid: int, updated_issue: Optional[Dict[str, Any]]) -> None:
+        """更新议题后刷新缓存：成功时缓存返回的最新议题，失败时丢弃缓存"""
+        if updated_issue:
+            self._issue_cache[issue_iid] = (time.monotonic(), updated_issue)
+        else:
+            self._issue_cache.pop(issue_iid, None)
+
+    def clear_cache(self) -> None:
+        """清空议题详情缓存"""
+        self._issue_cache.clear()
+
+    def get_issues_by_urls(self, gitlab_urls: List[str]) -> Dict[int, Dict[str, Any]]:
         """
-        return self.manager.get_issue(self.project_id, issue_iid)
+        批量获取多个URL对应的GitLab议题，返回 {iid: 议题}
+        """
+        iids = [iid for iid in map(extract_issue_iid, gitlab_urls) if iid]
+        if not iids:
+            return {}
+        return self.manager.list_issues_by_iids(self.project_id, iids)
 
     def create_issue(self, issue_data: Dict[str, Any], config: Dict[str, Any],
                     user_mapping: Dict[str, str]) -> Dict[str, Any]:
@@ -153,27 +218,30 @@ class GitLabOperations:
         """
         从标签列表中提取进度信息
         """
-        for label in labels:
-            if label.startswith('进度::'):
-                return label
-        return '进度::To do'
+        return first_progress_label(labels) or DEFAULT_PROGRESS_LABEL
 
-    def sync_progress_from_gitlab(self, gitlab_url: str) -> Optional[str]:
+    def sync_progress_from_gitlab(self, gitlab_url: str, issue_iid: Optional[int] = None,
+                                  gitlab_issue: Optional[Dict[str, Any]] = None, verbose: bool = True) -> Optional[str]:
         """
         从GitLab获取议题的当前进度信息并返回
         如果获取失败，返回None
         如果议题是closed状态，返回空字符串（closed状态的议题不应该有进度标签）
+        调用方已解析出 issue_iid 时可直接传入，避免重复解析URL
+        调用方已批量获取议题详情时可传入 gitlab_issue，避免逐条请求
+        verbose=False 时只输出失败信息，供批量处理时减少逐条输出
         """
         try:
-            if not gitlab_url or gitlab_url.strip() == '' or gitlab_url.upper() == 'NULL':
+            if not has_gitlab_url(gitlab_url):
                 return None
 
-            issue_iid = self.extract_issue_id_from_url(gitlab_url)
+            if issue_iid is None:
+                issue_iid = self.extract_issue_id_from_url(gitlab_url)
             if not issue_iid:
                 print(f"⚠️ 无法从URL提取议题IID: {gitlab_url}")
                 return None
 
-            gitlab_issue = self.get_issue(issue_iid)
+            if gitlab_issue is None:
+                gitlab_issue = self.get_issue(issue_iid)
             if not gitlab_issue:
                 print(f"⚠️ 无法从GitLab获取议题详情: IID={issue_iid}")
                 return None
@@ -181,11 +249,13 @@ class GitLabOperations:
             # 先检查议题状态，如果是closed，直接返回空字符串
             state = gitlab_issue.get('state', 'opened')
             if state == 'closed':
-                print(f"✅ 从GitLab同步进度信息: '' (closed状态，无进度标签)")
+                if verbose:
+                    print(f"✅ 从GitLab同步进度信息: '' (closed状态，无进度标签)")
                 return ''
 
             progress = self.get_issue_progress(gitlab_issue)
-            print(f"✅ 从GitLab同步进度信息: {progress}")
+            if verbose:
+                print(f"✅ 从GitLab同步进度信息: {progress}")
             return progress
 
         except Exception as e:
@@ -198,7 +268,7 @@ class GitLabOperations:
         如果议题状态为closed，则移除进度标签而不是添加
         """
         try:
-            gitlab_issue = self.manager.get_issue(self.project_id, issue_iid)
+            gitlab_issue = self.get_issue(issue_iid)
             if not gitlab_issue:
                 print(f"❌ 无法获取GitLab议题: IID={issue_iid}")
                 return False
@@ -209,13 +279,14 @@ class GitLabOperations:
                 if not isinstance(current_labels, list):
                     current_labels = []
 
-                updated_labels = [label for label in current_labels if not str(label).startswith('进度::')]
+                updated_labels = without_progress_labels(current_labels)
 
                 updated_issue = self.manager.update_issue(
                     project_id=self.project_id,
                     issue_iid=issue_iid,
                     labels=updated_labels
                 )
+                self._cache_updated_issue(issue_iid, updated_issue)
 
                 if updated_issue:
                     print(f"✅ GitLab议题已关闭，已移除进度标签")
@@ -228,7 +299,7 @@ class GitLabOperations:
             if not isinstance(current_labels, list):
                 current_labels = []
 
-            updated_labels = [label for label in current_labels if not str(label).startswith('进度::')]
+            updated_labels = without_progress_labels(current_labels)
             updated_labels.append(new_progress_label)
 
             updated_issue = self.manager.update_issue(
@@ -236,6 +307,7 @@ class GitLabOperations:
                 issue_iid=issue_iid,
                 labels=updated_labels
             )
+            self._cache_updated_issue(issue_iid, updated_issue)
 
             if updated_issue:
                 print(f"✅ GitLab议题标签更新成功: {new_progress_label}")
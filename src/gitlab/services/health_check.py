@@ -30,8 +30,7 @@ class HealthChecker:
     def check_database_connection(self):
         """检查数据库连接"""
         try:
-            result = self.db_manager.execute_query("SELECT 1 as test")
-            if result:
+            if self.db_manager.ping():
                 print("✅ 数据库连接正常")
                 return True
             else:
@@ -90,7 +89,7 @@ class HealthChecker:
             # 检查主要表是否存在
             tables = ['issues', 'sync_queue']
             for table in tables:
-                result = self.db_manager.execute_query(f"SHOW TABLES LIKE '{table}'")
+                result = self.db_manager.execute_query("SHOW TABLES LIKE %s", (table,))
                 if result:
                     print(f"✅ 数据表存在: {table}")
                 else:
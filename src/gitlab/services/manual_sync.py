@@ -7,8 +7,11 @@
 
 import sys
 import argparse
+import threading
 from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
 # 添加项目根目录到Python路径
 project_root = Path(__file__).parent
@@ -16,24 +19,142 @@ sys.path.append(str(project_root))
 
 from src.gitlab.core.database_manager import DatabaseManager
 from src.gitlab.core.config_manager import ConfigManager
+from src.gitlab.core.gitlab_operations import has_gitlab_url
+
+# 同步任务状态更新语句（参数绑定，避免错误信息中的引号破坏SQL）
+SYNC_TASK_CLAIM_SQL = "UPDATE sync_queue SET status = 'processing', processed_at = NOW() WHERE id IN ({placeholders})"
+SYNC_TASK_COMPLETED_SQL = "UPDATE sync_queue SET status = 'completed', processed_at = NOW() WHERE id IN ({placeholders})"
+SYNC_TASK_FAILED_SQL = (
+    "UPDATE sync_queue SET status = 'failed', error_message = CASE id {cases} END, processed_at = NOW() "
+    "WHERE id IN ({placeholders})"
+)
+
+# 处理中的任务超过该时间（分钟）仍未写回状态（如进程中断、写回失败），认领前重置为 pending
+SYNC_TASK_STALE_MINUTES = 30
+SYNC_TASK_RECLAIM_SQL = (
+    "UPDATE sync_queue SET status = 'pending' "
+    "WHERE status = 'processing' AND processed_at < NOW() - INTERVAL %s MINUTE"
+)
+
+# 认领条件：议题没有正在处理（processing）的任务
+SYNC_TASK_ISSUE_IDLE_CONDITION = (
+    "NOT EXISTS (SELECT 1 FROM sync_queue p WHERE p.issue_id = q.issue_id AND p.status = 'processing')"
+)
+
+# 同步任务以等待GitLab响应为主，不同议题的任务并发处理的线程数
+# 线程池在进程内共享（首次使用时创建），多次队列处理复用线程，合计并发不超过该值
+SYNC_TASK_WORKERS = 8
+_task_executor: Optional[ThreadPoolExecutor] = None
+# 单次队列处理同时在途的任务组上限
+SYNC_TASK_MAX_IN_FLIGHT = 2 * SYNC_TASK_WORKERS
+_task_executor_lock = threading.Lock()
+
+# 批量预取议题、批量写回任务状态时每条 WHERE id IN 语句的ID数量
+ISSUE_PREFETCH_BATCH_SIZE = 500
+
+class SyncTaskStatusBuffer:
+    """
+    收集一批同步任务的完成/失败结果，批次结束后在同一事务中写回
+    完成的任务合并为一条 UPDATE ... WHERE id IN，失败的任务用 CASE id WHEN 写入各自的错误信息
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._completed: List[Any] = []
+        self._failed: List[Tuple[Any, str]] = []
+
+    def completed(self, task_id):
+        """记录完成的任务"""
+        with self._lock:
+            self._completed.append(task_id)
+
+    def failed(self, task_id, error_msg):
+        """记录失败的任务及错误信息"""
+        with self._lock:
+            self._failed.append((task_id, str(error_msg)))
+
+    def flush(self, db_manager):
+        """写回所有已记录的任务状态，成功返回 True"""
+        with self._lock:
+            completed, self._completed = self._completed, []
+            failed, self._failed = self._failed, []
+
+        statements = []
+        for start in range(0, len(completed), ISSUE_PREFETCH_BATCH_SIZE):
+            batch = completed[start:start + ISSUE_PREFETCH_BATCH_SIZE]
+            statements.append((SYNC_TASK_COMPLETED_SQL.format(placeholders=', '.join(['%s'] * len(batch))), batch))
+        for start in range(0, len(failed), ISSUE_PREFETCH_BATCH_SIZE):
+            batch = failed[start:start + ISSUE_PREFETCH_BATCH_SIZE]
+            query = SYNC_TASK_FAILED_SQL.format(
+                cases=' '.join(['WHEN %s THEN %s'] * len(batch)),
+                placeholders=', '.join(['%s'] * len(batch)),
+            )
+            params: List[Any] = [v for item in batch for v in item]
+            params.extend(task_id for task_id, _ in batch)
+            statements.append((query, params))
+
+        if db_manager.execute_transaction(statements):
+            return True
+
+        # 事务失败时退回逐条更新，避免整批任务停留在 processing 状态
+        print(f"⚠️ 批量写回任务状态失败，改为逐条更新: 完成 {len(completed)} 个, 失败 {len(failed)} 个")
+        lost = 0
+        for task_id in completed:
+            if not db_manager.execute_update(SYNC_TASK_COMPLETED_SQL.format(placeholders='%s'), (task_id,)):
+                lost += 1
+        failed_query = SYNC_TASK_FAILED_SQL.format(cases='WHEN %s THEN %s', placeholders='%s')
+        for task_id, error_msg in failed:
+            if not db_manager.execute_update(failed_query, (task_id, error_msg, task_id)):
+                lost += 1
+        if lost:
+            print(f"❌ {lost} 个任务状态写回失败，超过 {SYNC_TASK_STALE_MINUTES} 分钟后将重新进入待处理队列")
+            return False
+        return True
+
+def get_task_executor():
+    """返回共享的同步任务线程池"""
+    global _task_executor
+    if _task_executor is None:
+        with _task_executor_lock:
+            if _task_executor is None:
+                _task_executor = ThreadPoolExecutor(max_workers=SYNC_TASK_WORKERS, thread_name_prefix='sync-task')
+    return _task_executor
 
 def get_issue_by_id(db_manager, issue_id):
     """从数据库获取议题详细信息"""
     try:
-        query = f"SELECT * FROM issues WHERE id = {issue_id}"
-        result = db_manager.execute_query(query)
+        query = "SELECT * FROM issues WHERE id = %s"
+        result = db_manager.execute_query(query, (issue_id,))
         return result[0] if result else None
     except Exception as e:
         print(f"❌ 获取议题详细信息失败: {str(e)}")
         return None
 
-def sync_issue_to_gitlab(db_manager, config_manager, issue_id, action='create'):
-    """立即同步议题到 GitLab"""
+def get_issues_by_ids(db_manager, issue_ids):
+    """按 WHERE id IN 批量获取议题详细信息，返回 {议题ID: 议题}"""
+    issues_by_id = {}
+    ids = list(dict.fromkeys(issue_ids))
+    try:
+        for start in range(0, len(ids), ISSUE_PREFETCH_BATCH_SIZE):
+            batch = ids[start:start + ISSUE_PREFETCH_BATCH_SIZE]
+            query = f"SELECT * FROM issues WHERE id IN ({', '.join(['%s'] * len(batch))})"
+            for row in db_manager.execute_query(query, batch):
+                issues_by_id[row['id']] = row
+    except Exception as e:
+        print(f"❌ 批量获取议题详细信息失败: {str(e)}")
+    return issues_by_id
+
+def sync_issue_to_gitlab(db_manager, config_manager, issue_id, action='create', issue_data=None):
+    """
+    立即同步议题到 GitLab
+    issue_data 为调用方预取的议题记录，未提供时按ID查询
+    """
     try:
         print(f"🔗 开始同步议题到 GitLab: ID={issue_id}, 操作={action}")
 
         # 获取议题详细信息
-        issue_data = get_issue_by_id(db_manager, issue_id)
+        if issue_data is None:
+            issue_data = get_issue_by_id(db_manager, issue_id)
         if not issue_data:
             return {'success': False, 'error': '议题不存在'}
 
@@ -53,9 +174,12 @@ def sync_issue_to_gitlab(db_manager, config_manager, issue_id, action='create'):
 
         # 在同步前，先从GitLab获取当前进度信息并更新到数据库
         gitlab_url = issue_data.get('gitlab_url', '')
-        if gitlab_url and gitlab_url.strip() and gitlab_url.upper() != 'NULL':
+        url_present = has_gitlab_url(gitlab_url)
+        # 只解析一次议题IID，拉取进度与关闭操作共用
+        issue_iid = gitlab_ops.extract_issue_id_from_url(gitlab_url) if url_present else None
+        if url_present:
             print(f"🔄 同步前拉取GitLab进度信息...")
-            progress = gitlab_ops.sync_progress_from_gitlab(gitlab_url)
+            progress = gitlab_ops.sync_progress_from_gitlab(gitlab_url, issue_iid)
             if progress:
                 db_manager.update_issue_progress(issue_id, progress)
                 print(f"✅ 已更新数据库进度信息: {progress}")
@@ -63,6 +187,11 @@ def sync_issue_to_gitlab(db_manager, config_manager, issue_id, action='create'):
                 print(f"⚠️ 未能从GitLab获取进度信息，继续执行同步")
 
         if action == 'create':
+            # 已记录GitLab URL说明议题此前已创建（如重复入队的创建任务），直接返回，避免重复创建
+            if url_present:
+                print(f"✅ 议题已关联GitLab议题，跳过创建: {gitlab_url}")
+                return {'success': True, 'gitlab_url': gitlab_url}
+
             # 创建新议题
             print(f"📝 创建 GitLab 议题: {issue_data.get('project_name')}")
             # 使用完整配置以包含 labels 映射（严重程度/进度/类型等）
@@ -72,12 +201,12 @@ def sync_issue_to_gitlab(db_manager, config_manager, issue_id, action='create'):
             if result and result.get('success'):
                 gitlab_url = result.get('url', '')
                 # 更新数据库中的 gitlab_url
-                update_sql = f"""
+                update_sql = """
                 UPDATE issues
-                SET gitlab_url = '{gitlab_url}', sync_status = 'synced', last_sync_time = NOW()
-                WHERE id = {issue_id}
+                SET gitlab_url = %s, sync_status = 'synced', last_sync_time = NOW()
+                WHERE id = %s
                 """
-                db_manager.execute_update(update_sql)
+                db_manager.execute_update(update_sql, (gitlab_url, issue_id))
                 print(f"✅ GitLab 议题创建成功: {gitlab_url}")
                 return {'success': True, 'gitlab_url': gitlab_url}
             else:
@@ -87,21 +216,20 @@ def sync_issue_to_gitlab(db_manager, config_manager, issue_id, action='create'):
 
         elif action == 'close':
             # 关闭议题并移除标签
-            if gitlab_url and gitlab_url.upper() != 'NULL':
+            if url_present:
                 print(f"🔒 关闭 GitLab 议题: {gitlab_url}")
-                issue_iid = gitlab_ops.extract_issue_id_from_url(gitlab_url)
                 if issue_iid:
                     close_success: bool = gitlab_ops.close_issue(issue_iid, issue_data)
                     if close_success:
                         # 更新同步状态并清空进度标签
-                        update_sql = f"""
+                        update_sql = """
                         UPDATE issues
                         SET sync_status = 'synced',
                             last_sync_time = NOW(),
                             gitlab_progress = ''
-                        WHERE id = {issue_id}
+                        WHERE id = %s
                         """
-                        db_manager.execute_update(update_sql)
+                        db_manager.execute_update(update_sql, (issue_id,))
                         print(f"✅ GitLab 议题关闭成功，已清空进度标签")
                         return {'success': True}
                     else:
@@ -118,28 +246,223 @@ def sync_issue_to_gitlab(db_manager, config_manager, issue_id, action='create'):
         print(f"❌ GitLab 同步异常: {error_msg}")
         return {'success': False, 'error': error_msg}
 
+def process_sync_task(db_manager, config_manager, task, index, total, status_buffer, issue_data=None):
+    """
+    处理单个同步任务，任务结果记录到 status_buffer，由调用方批量写回
+    issue_data 为预取的议题记录（只在议题尚未被本轮其他任务修改时传入）
+    返回本任务的计数增量 (processed, success, failed, skipped)
+    """
+    processed_count = 0
+    success_count = 0
+    failed_count = 0
+    skipped_count = 0
+
+    task_id = task['id']
+    issue_id = task['issue_id']
+    action = task['action']
+    # metadata = task.get('metadata', '{}')  # 暂时未使用
+
+    print(f"\n📋 处理任务 {index}/{total}: ID={task_id}, 议题={issue_id}, 操作={action}")
+
+    try:
+        # 任务已在认领时批量标记为 processing，直接执行同步操作
+        if action == 'close':
+            # 关闭议题
+            result = sync_issue_to_gitlab(db_manager, config_manager, issue_id, action='close', issue_data=issue_data)
+            if result.get('success'):
+                # 更新任务状态为 completed
+                status_buffer.completed(task_id)
+                success_count += 1
+                print(f"✅ 任务 {task_id} 完成: 议题 {issue_id} 已关闭")
+            else:
+                # 更新任务状态为 failed
+                error_msg = result.get('error', '未知错误')
+                status_buffer.failed(task_id, error_msg)
+                failed_count += 1
+                print(f"❌ 任务 {task_id} 失败: {error_msg}")
+
+        elif action == 'create':
+            # 创建议题
+            result = sync_issue_to_gitlab(db_manager, config_manager, issue_id, action='create', issue_data=issue_data)
+            if result.get('success'):
+                status_buffer.completed(task_id)
+                success_count += 1
+                print(f"✅ 任务 {task_id} 完成: 议题 {issue_id} 已创建")
+            else:
+                error_msg = result.get('error', '未知错误')
+                status_buffer.failed(task_id, error_msg)
+                failed_count += 1
+                print(f"❌ 任务 {task_id} 失败: {error_msg}")
+
+        elif action == 'create_and_close':
+            # 先创建再关闭
+            create_result = sync_issue_to_gitlab(db_manager, config_manager, issue_id, action='create', issue_data=issue_data)
+            if create_result.get('success'):
+                # 创建后 gitlab_url 已变化，关闭时重新查询议题
+                close_result = sync_issue_to_gitlab(db_manager, config_manager, issue_id, action='close')
+                if close_result.get('success'):
+                    status_buffer.completed(task_id)
+                    success_count += 1
+                    print(f"✅ 任务 {task_id} 完成: 议题 {issue_id} 已创建并关闭")
+                else:
+                    error_msg = f"创建成功但关闭失败: {close_result.get('error', '未知错误')}"
+                    status_buffer.failed(task_id, error_msg)
+                    failed_count += 1
+                    print(f"❌ 任务 {task_id} 失败: {error_msg}")
+            else:
+                error_msg = f"创建失败: {create_result.get('error', '未知错误')}"
+                status_buffer.failed(task_id, error_msg)
+                failed_count += 1
+                print(f"❌ 任务 {task_id} 失败: {error_msg}")
+
+        elif action == 'update':
+            # 更新议题标签
+            try:
+                import json
+                metadata = task.get('metadata', '{}')
+                if isinstance(metadata, str):
+                    metadata = json.loads(metadata)
+                elif not isinstance(metadata, dict):
+                    metadata = {}
+
+                progress_label = metadata.get('progress_label', '进度::To do')
+
+                if issue_data is None:
+                    issue_data = get_issue_by_id(db_manager, issue_id)
+                if not issue_data:
+                    error_msg = '议题不存在'
+                    status_buffer.failed(task_id, error_msg)
+                    failed_count += 1
+                    print(f"❌ 任务 {task_id} 失败: {error_msg}")
+                    return processed_count, success_count, failed_count, skipped_count
+
+                issue_status = issue_data.get('status', 'open')
+                if issue_status == 'closed':
+                    gitlab_url = issue_data.get('gitlab_url', '')
+                    if not has_gitlab_url(gitlab_url):
+                        status_buffer.completed(task_id)
+                        success_count += 1
+                        print(f"✅ 任务 {task_id} 完成: 议题 {issue_id} 状态为closed，跳过标签更新")
+                        return processed_count, success_count, failed_count, skipped_count
+
+                    from src.gitlab.core.gitlab_operations import GitLabOperations
+                    gitlab_ops = GitLabOperations()
+                    issue_iid = gitlab_ops.extract_issue_id_from_url(gitlab_url)
+
+                    if not issue_iid:
+                        error_msg = '无法从URL提取议题IID'
+                        status_buffer.failed(task_id, error_msg)
+                        failed_count += 1
+                        print(f"❌ 任务 {task_id} 失败: {error_msg}")
+                        return processed_count, success_count, failed_count, skipped_count
+
+                    close_success = gitlab_ops.close_issue(issue_iid, issue_data)
+                    if close_success:
+                        status_buffer.completed(task_id)
+                        success_count += 1
+                        print(f"✅ 任务 {task_id} 完成: 议题 {issue_id} 状态为closed，已关闭GitLab议题并移除进度标签")
+                        return processed_count, success_count, failed_count, skipped_count
+                    else:
+                        error_msg = '关闭议题失败'
+                        status_buffer.failed(task_id, error_msg)
+                        failed_count += 1
+                        print(f"❌ 任务 {task_id} 失败: {error_msg}")
+                        return processed_count, success_count, failed_count, skipped_count
+                else:
+                    gitlab_url = issue_data.get('gitlab_url', '')
+                    if not has_gitlab_url(gitlab_url):
+                        error_msg = '没有有效的GitLab URL'
+                        status_buffer.failed(task_id, error_msg)
+                        failed_count += 1
+                        print(f"❌ 任务 {task_id} 失败: {error_msg}")
+                        return processed_count, success_count, failed_count, skipped_count
+
+                    from src.gitlab.core.gitlab_operations import GitLabOperations
+                    gitlab_ops = GitLabOperations()
+                    issue_iid = gitlab_ops.extract_issue_id_from_url(gitlab_url)
+
+                    if not issue_iid:
+                        error_msg = '无法从URL提取议题IID'
+                        status_buffer.failed(task_id, error_msg)
+                        failed_count += 1
+                        print(f"❌ 任务 {task_id} 失败: {error_msg}")
+                        return processed_count, success_count, failed_count, skipped_count
+
+                    success = gitlab_ops.update_issue_labels(issue_iid, progress_label)
+                if success:
+                    status_buffer.completed(task_id)
+                    success_count += 1
+                    print(f"✅ 任务 {task_id} 完成: 议题 {issue_id} 标签已更新为'{progress_label}'")
+                else:
+                    error_msg = '标签更新失败'
+                    status_buffer.failed(task_id, error_msg)
+                    failed_count += 1
+                    print(f"❌ 任务 {task_id} 失败: {error_msg}")
+            except Exception as e:
+                error_msg = str(e)
+                status_buffer.failed(task_id, error_msg)
+                failed_count += 1
+                print(f"❌ 任务 {task_id} 失败: {error_msg}")
+
+        else:
+            # 未知操作类型
+            status_buffer.failed(task_id, f"未知操作类型: {action}")
+            skipped_count += 1
+            print(f"⚠️ 任务 {task_id} 跳过: 未知操作类型 {action}")
+
+        processed_count += 1
+
+    except Exception as e:
+        # 处理异常
+        error_msg = str(e)
+        status_buffer.failed(task_id, error_msg)
+        failed_count += 1
+        processed_count += 1
+        print(f"❌ 任务 {task_id} 异常: {error_msg}")
+
+    return processed_count, success_count, failed_count, skipped_count
+
+def process_sync_task_group(db_manager, config_manager, tasks, total, status_buffer, issue_data=None):
+    """
+    按顺序处理同一议题的任务（如先创建后关闭），返回计数增量之和
+    预取的议题记录只用于第一个任务，之后的任务可能读到已被修改的议题，重新查询
+    """
+    totals = [0, 0, 0, 0]
+    for index, task in tasks:
+        counts = process_sync_task(db_manager, config_manager, task, index, total, status_buffer, issue_data)
+        issue_data = None
+        totals = [t + c for t, c in zip(totals, counts)]
+    return totals
+
 def process_pending_sync_queue(db_manager, config_manager, action_filter=None, limit=50):
     """处理待同步队列中的任务"""
     try:
         print(f"🔄 开始处理待同步队列...")
 
-        # 构建查询条件
-        where_conditions = ["status = 'pending'"]
+        # 回收长时间停留在 processing 的任务
+        db_manager.execute_update(SYNC_TASK_RECLAIM_SQL, (SYNC_TASK_STALE_MINUTES,))
+
+        # 构建查询条件：跳过仍有 processing 任务的议题，避免其后续任务（如关闭）先于正在执行的创建被处理
+        where_conditions = ["status = 'pending'", SYNC_TASK_ISSUE_IDLE_CONDITION]
+        params = []
         if action_filter:
-            where_conditions.append(f"action = '{action_filter}'")
+            where_conditions.append("action = %s")
+            params.append(action_filter)
 
         where_clause = " AND ".join(where_conditions)
 
-        # 查询待处理任务
+        # 锁定并认领待处理任务：查询与标记 processing 在同一事务中完成
         query = f"""
         SELECT id, issue_id, action, priority, metadata, created_at
-        FROM sync_queue
+        FROM sync_queue q
         WHERE {where_clause}
         ORDER BY priority ASC, created_at ASC
-        LIMIT {limit}
+        LIMIT %s
+        FOR UPDATE
         """
+        params.append(int(limit))
 
-        pending_tasks = db_manager.execute_query(query)
+        pending_tasks = db_manager.claim_rows(query, params, SYNC_TASK_CLAIM_SQL)
 
         if not pending_tasks:
             print(f"✅ 没有待处理的同步任务")
@@ -152,275 +475,37 @@ def process_pending_sync_queue(db_manager, config_manager, action_filter=None, l
 
         print(f"📋 找到 {len(pending_tasks)} 个待处理任务")
 
-        processed_count = 0
-        success_count = 0
-        failed_count = 0
-        skipped_count = 0
-
+        # 同一议题的任务保持原有顺序串行处理，不同议题之间并发调用GitLab接口
+        task_groups: Dict[Any, List[Tuple[int, Dict[str, Any]]]] = {}
         for i, task in enumerate(pending_tasks, 1):
-            task_id = task['id']
-            issue_id = task['issue_id']
-            action = task['action']
-            # metadata = task.get('metadata', '{}')  # 暂时未使用
-
-            print(f"\n📋 处理任务 {i}/{len(pending_tasks)}: ID={task_id}, 议题={issue_id}, 操作={action}")
-
-            try:
-                # 1. 更新任务状态为 processing
-                update_task_sql = f"""
-                UPDATE sync_queue
-                SET status = 'processing', processed_at = NOW()
-                WHERE id = {task_id}
-                """
-                db_manager.execute_update(update_task_sql)
-
-                # 2. 执行同步操作
-                if action == 'close':
-                    # 关闭议题
-                    result = sync_issue_to_gitlab(db_manager, config_manager, issue_id, action='close')
-                    if result.get('success'):
-                        # 更新任务状态为 completed
-                        complete_sql = f"""
-                        UPDATE sync_queue
-                        SET status = 'completed', processed_at = NOW()
-                        WHERE id = {task_id}
-                        """
-                        db_manager.execute_update(complete_sql)
-                        success_count += 1
-                        print(f"✅ 任务 {task_id} 完成: 议题 {issue_id} 已关闭")
-                    else:
-                        # 更新任务状态为 failed
-                        error_msg = result.get('error', '未知错误')
-                        fail_sql = f"""
-                        UPDATE sync_queue
-                        SET status = 'failed', error_message = '{error_msg}', processed_at = NOW()
-                        WHERE id = {task_id}
-                        """
-                        db_manager.execute_update(fail_sql)
-                        failed_count += 1
-                        print(f"❌ 任务 {task_id} 失败: {error_msg}")
-
-                elif action == 'create':
-                    # 创建议题
-                    result = sync_issue_to_gitlab(db_manager, config_manager, issue_id, action='create')
-                    if result.get('success'):
-                        complete_sql = f"""
-                        UPDATE sync_queue
-                        SET status = 'completed', processed_at = NOW()
-                        WHERE id = {task_id}
-                        """
-                        db_manager.execute_update(complete_sql)
-                        success_count += 1
-                        print(f"✅ 任务 {task_id} 完成: 议题 {issue_id} 已创建")
-                    else:
-                        error_msg = result.get('error', '未知错误')
-                        fail_sql = f"""
-                        UPDATE sync_queue
-                        SET status = 'failed', error_message = '{error_msg}', processed_at = NOW()
-                        WHERE id = {task_id}
-                        """
-                        db_manager.execute_update(fail_sql)
-                        failed_count += 1
-                        print(f"❌ 任务 {task_id} 失败: {error_msg}")
-
-                elif action == 'create_and_close':
-                    # 先创建再关闭
-                    create_result = sync_issue_to_gitlab(db_manager, config_manager, issue_id, action='create')
-                    if create_result.get('success'):
-                        close_result = sync_issue_to_gitlab(db_manager, config_manager, issue_id, action='close')
-                        if close_result.get('success'):
-                            complete_sql = f"""
-                            UPDATE sync_queue
-                            SET status = 'completed', processed_at = NOW()
-                            WHERE id = {task_id}
-                            """
-                            db_manager.execute_update(complete_sql)
-                            success_count += 1
-                            print(f"✅ 任务 {task_id} 完成: 议题 {issue_id} 已创建并关闭")
-                        else:
-                            error_msg = f"创建成功但关闭失败: {close_result.get('error', '未知错误')}"
-                            fail_sql = f"""
-                            UPDATE sync_queue
-                            SET status = 'failed', error_message = '{error_msg}', processed_at = NOW()
-                            WHERE id = {task_id}
-                            """
-                            db_manager.execute_update(fail_sql)
-                            failed_count += 1
-                            print(f"❌ 任务 {task_id} 失败: {error_msg}")
-                    else:
-                        error_msg = f"创建失败: {create_result.get('error', '未知错误')}"
-                        fail_sql = f"""
-                        UPDATE sync_queue
-                        SET status = 'failed', error_message = '{error_msg}', processed_at = NOW()
-                        WHERE id = {task_id}
-                        """
-                        db_manager.execute_update(fail_sql)
-                        failed_count += 1
-                        print(f"❌ 任务 {task_id} 失败: {error_msg}")
-
-                elif action == 'update':
-                    # 更新议题标签
-                    try:
-                        import json
-                        metadata = task.get('metadata', '{}')
-                        if isinstance(metadata, str):
-                            metadata = json.loads(metadata)
-                        elif not isinstance(metadata, dict):
-                            metadata = {}
-
-                        progress_label = metadata.get('progress_label', '进度::To do')
-
-                        issue_data = get_issue_by_id(db_manager, issue_id)
-                        if not issue_data:
-                            error_msg = '议题不存在'
-                            fail_sql = f"""
-                            UPDATE sync_queue
-                            SET status = 'failed', error_message = '{error_msg}', processed_at = NOW()
-                            WHERE id = {task_id}
-                            """
-                            db_manager.execute_update(fail_sql)
-                            failed_count += 1
-                            print(f"❌ 任务 {task_id} 失败: {error_msg}")
-                            continue
-
-                        issue_status = issue_data.get('status', 'open')
-                        if issue_status == 'closed':
-                            gitlab_url = issue_data.get('gitlab_url', '')
-                            if not gitlab_url or gitlab_url.strip() == '' or gitlab_url.strip().upper() == 'NULL':
-                                complete_sql = f"""
-                                UPDATE sync_queue
-                                SET status = 'completed', processed_at = NOW()
-                                WHERE id = {task_id}
-                                """
-                                db_manager.execute_update(complete_sql)
-                                success_count += 1
-                                print(f"✅ 任务 {task_id} 完成: 议题 {issue_id} 状态为closed，跳过标签更新")
-                                continue
-
-                            from src.gitlab.core.gitlab_operations import GitLabOperations
-                            gitlab_ops = GitLabOperations()
-                            issue_iid = gitlab_ops.extract_issue_id_from_url(gitlab_url)
-
-                            if not issue_iid:
-                                error_msg = '无法从URL提取议题IID'
-                                fail_sql = f"""
-                                UPDATE sync_queue
-                                SET status = 'failed', error_message = '{error_msg}', processed_at = NOW()
-                                WHERE id = {task_id}
-                                """
-                                db_manager.execute_update(fail_sql)
-                                failed_count += 1
-                                print(f"❌ 任务 {task_id} 失败: {error_msg}")
-                                continue
-
-                            close_success = gitlab_ops.close_issue(issue_iid, issue_data)
-                            if close_success:
-                                complete_sql = f"""
-                                UPDATE sync_queue
-                                SET status = 'completed', processed_at = NOW()
-                                WHERE id = {task_id}
-                                """
-                                db_manager.execute_update(complete_sql)
-                                success_count += 1
-                                print(f"✅ 任务 {task_id} 完成: 议题 {issue_id} 状态为closed，已关闭GitLab议题并移除进度标签")
-                                continue
-                            else:
-                                error_msg = '关闭议题失败'
-                                fail_sql = f"""
-                                UPDATE sync_queue
-                                SET status = 'failed', error_message = '{error_msg}', processed_at = NOW()
-                                WHERE id = {task_id}
-                                """
-                                db_manager.execute_update(fail_sql)
-                                failed_count += 1
-                                print(f"❌ 任务 {task_id} 失败: {error_msg}")
-                                continue
-                        else:
-                            gitlab_url = issue_data.get('gitlab_url', '')
-                            if not gitlab_url or gitlab_url.strip() == '' or gitlab_url.strip().upper() == 'NULL':
-                                error_msg = '没有有效的GitLab URL'
-                                fail_sql = f"""
-                                UPDATE sync_queue
-                                SET status = 'failed', error_message = '{error_msg}', processed_at = NOW()
-                                WHERE id = {task_id}
-                                """
-                                db_manager.execute_update(fail_sql)
-                                failed_count += 1
-                                print(f"❌ 任务 {task_id} 失败: {error_msg}")
-                                continue
-
-                            from src.gitlab.core.gitlab_operations import GitLabOperations
-                            gitlab_ops = GitLabOperations()
-                            issue_iid = gitlab_ops.extract_issue_id_from_url(gitlab_url)
-
-                            if not issue_iid:
-                                error_msg = '无法从URL提取议题IID'
-                                fail_sql = f"""
-                                UPDATE sync_queue
-                                SET status = 'failed', error_message = '{error_msg}', processed_at = NOW()
-                                WHERE id = {task_id}
-                                """
-                                db_manager.execute_update(fail_sql)
-                                failed_count += 1
-                                print(f"❌ 任务 {task_id} 失败: {error_msg}")
-                                continue
-
-                            success = gitlab_ops.update_issue_labels(issue_iid, progress_label)
-                        if success:
-                            complete_sql = f"""
-                            UPDATE sync_queue
-                            SET status = 'completed', processed_at = NOW()
-                            WHERE id = {task_id}
-                            """
-                            db_manager.execute_update(complete_sql)
-                            success_count += 1
-                            print(f"✅ 任务 {task_id} 完成: 议题 {issue_id} 标签已更新为'{progress_label}'")
-                        else:
-                            error_msg = '标签更新失败'
-                            fail_sql = f"""
-                            UPDATE sync_queue
-                            SET status = 'failed', error_message = '{error_msg}', processed_at = NOW()
-                            WHERE id = {task_id}
-                            """
-                            db_manager.execute_update(fail_sql)
-                            failed_count += 1
-                            print(f"❌ 任务 {task_id} 失败: {error_msg}")
-                    except Exception as e:
-                        error_msg = str(e)
-                        fail_sql = f"""
-                        UPDATE sync_queue
-                        SET status = 'failed', error_message = '{error_msg}', processed_at = NOW()
-                        WHERE id = {task_id}
-                        """
-                        db_manager.execute_update(fail_sql)
-                        failed_count += 1
-                        print(f"❌ 任务 {task_id} 失败: {error_msg}")
-
-                else:
-                    # 未知操作类型
-                    fail_sql = f"""
-                    UPDATE sync_queue
-                    SET status = 'failed', error_message = '未知操作类型: {action}', processed_at = NOW()
-                    WHERE id = {task_id}
-                    """
-                    db_manager.execute_update(fail_sql)
-                    skipped_count += 1
-                    print(f"⚠️ 任务 {task_id} 跳过: 未知操作类型 {action}")
-
-                processed_count += 1
-
-            except Exception as e:
-                # 处理异常
-                error_msg = str(e)
-                fail_sql = f"""
-                UPDATE sync_queue
-                SET status = 'failed', error_message = '{error_msg}', processed_at = NOW()
-                WHERE id = {task_id}
-                """
-                db_manager.execute_update(fail_sql)
-                failed_count += 1
-                processed_count += 1
-                print(f"❌ 任务 {task_id} 异常: {error_msg}")
+            task_groups.setdefault(task['issue_id'], []).append((i, task))
+
+        # 一次查询预取所有相关议题，避免每个任务单独查询
+        issues_by_id = get_issues_by_ids(db_manager, list(task_groups))
+        # 任务完成/失败状态在整批处理结束后统一写回
+        status_buffer = SyncTaskStatusBuffer()
+
+        # 滑动窗口提交：同时在途的任务组不超过 SYNC_TASK_MAX_IN_FLIGHT，完成一个再提交一个，
+        # 避免一次处理独占共享线程池，其他并行的队列处理也能及时得到线程
+        totals = [0, 0, 0, 0]
+        in_flight = set()
+        try:
+            executor = get_task_executor()
+            for issue_id, tasks in task_groups.items():
+                if len(in_flight) >= SYNC_TASK_MAX_IN_FLIGHT:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        totals = [t + c for t, c in zip(totals, future.result())]
+                in_flight.add(executor.submit(process_sync_task_group, db_manager, config_manager, tasks,
+                                              len(pending_tasks), status_buffer, issues_by_id.get(issue_id)))
+            done, in_flight = wait(in_flight)
+            for future in done:
+                totals = [t + c for t, c in zip(totals, future.result())]
+        finally:
+            # 即使处理中途异常，也等已提交的任务结束后写回它们记录的状态
+            wait(in_flight)
+            status_buffer.flush(db_manager)
+        processed_count, success_count, failed_count, skipped_count = totals
 
         result = {
             'processed': processed_count,
@@ -1,11 +1,26 @@
-from typing import Any
+from typing import Any, MutableMapping
+
+from . import adapters as adapters
+
+class RequestException(IOError): ...
 
 class Response:
     status_code: int
+    content: bytes
+    text: str
+    headers: MutableMapping[str, str]
     def json(self) -> Any: ...
     def raise_for_status(self) -> None: ...
 
+class Session:
+    headers: MutableMapping[str, str]
+    def mount(self, prefix: str, adapter: adapters.HTTPAdapter) -> None: ...
+    def request(self, method: str, url: str, *args: Any, **kwargs: Any) -> Response: ...
+    def get(self, url: str, *args: Any, **kwargs: Any) -> Response: ...
+    def post(self, url: str, *args: Any, **kwargs: Any) -> Response: ...
+    def put(self, url: str, *args: Any, **kwargs: Any) -> Response: ...
+    def close(self) -> None: ...
+
 def get(*args: Any, **kwargs: Any) -> Response: ...
 def post(*args: Any, **kwargs: Any) -> Response: ...
 def put(*args: Any, **kwargs: Any) -> Response: ...
-
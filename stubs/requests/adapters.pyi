@@ -0,0 +1,11 @@
+from typing import Any
+
+class HTTPAdapter:
+    def __init__(
+        self,
+        pool_connections: int = ...,
+        pool_maxsize: int = ...,
+        max_retries: Any = ...,
+        pool_block: bool = ...,
+    ) -> None: ...
+    def close(self) -> None: ...